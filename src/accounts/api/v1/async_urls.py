@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import async_views
+
+app_name = "accounts-async"
+
+urlpatterns = [
+    path("profile/", async_views.AsyncProfileView.as_view(), name="profile"),
+]
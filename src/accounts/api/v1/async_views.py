@@ -0,0 +1,40 @@
+"""
+Async twin of the profile endpoint in views.py, served under /api/v1/async/accounts/.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import IsAuthenticated
+
+from accounts.selectors import aget_profile
+from blog.selectors import aget_favorite_ids, aget_favorite_posts
+from core.async_views import AsyncAPIView
+
+from .paginations import ProfileFavoritePostPagination
+from .serializers import ProfileSerializer
+from .views import ProfileReadMixin
+
+
+class AsyncProfileView(ProfileReadMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        fields, context, columns = self.get_profile_context(request)
+        profile = await aget_profile(request.user, columns=columns)
+        data = ProfileSerializer(profile, context=context).data
+
+        paginator = ProfileFavoritePostPagination()
+        with_favorites = fields is None or "favoritepost" in fields
+        page = paginator.paginate_queryset(
+            await aget_favorite_ids(profile) if with_favorites else [],
+            request=request,
+        )
+        if with_favorites:
+            favorite_posts = await aget_favorite_posts(page)
+            expander = self.get_expander(request)
+            if expander.expansions:
+                await sync_to_async(expander.load)(
+                    [favorite.post for favorite in favorite_posts]
+                )
+            data["favoritepost"] = self.get_favorites_data(
+                request, favorite_posts, expander
+            )
+        return paginator.get_paginated_response(data)
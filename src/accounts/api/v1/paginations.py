@@ -1,16 +1,55 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+
 from rest_framework.response import Response
 
+from blog.api.v1.paginations import KeysetPagination
+
+
+class ProfileFavoritePostPagination(KeysetPagination):
+    """
+    Cursor pagination over the cached favorite ids of a profile, newest first. The
+    page holds the ids, not the favorites.
+    """
 
-class ProfileFavoritePostPagination(PageNumberPagination):
     page_size = 10
+    ordering = ("-id",)
+
+    def paginate_queryset(self, favorites, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.count = len(favorites)
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            position, reverse = None, False
+        else:
+            (position,), reverse = cursor
+
+        if reverse:
+            favorites = [favorite for favorite in favorites if favorite > position]
+            self.page = favorites[-self.page_size :]
+            self.has_next = True
+            self.has_previous = len(favorites) > self.page_size
+        else:
+            if position is not None:
+                favorites = [favorite for favorite in favorites if favorite < position]
+            self.page = favorites[: self.page_size]
+            self.has_next = len(favorites) > self.page_size
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_position(self, item):
+        return [item]
 
     def get_paginated_response(self, data):
         return Response(
-            {
-                "count": self.page.paginator.count,
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": data,
-            }
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
         )
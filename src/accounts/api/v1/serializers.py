@@ -6,7 +6,8 @@ from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from accounts.models import Profile
-from blog.api.v1.serializers import FavoritePostSerializer
+from core.fieldsets import SparseFieldsetMixin
+from core.metrics import SerializeMetricsMixin
 
 User = get_user_model()
 
@@ -154,11 +155,18 @@ class PasswordResetTokenValidateSerializer(serializers.Serializer):
         return super().validate(attrs)
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(
+    SerializeMetricsMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     email = serializers.EmailField(source="user.email", read_only=True)
     first_name = serializers.CharField(source="user.first_name")
     last_name = serializers.CharField(source="user.last_name")
-    favoritepost = FavoritePostSerializer(many=True, read_only=True)
+
+    field_columns = {
+        "email": ("user__email",),
+        "first_name": ("user__first_name",),
+        "last_name": ("user__last_name",),
+    }
 
     class Meta:
         model = Profile
@@ -170,5 +178,4 @@ class ProfileSerializer(serializers.ModelSerializer):
             "image",
             "bio",
             "birth_date",
-            "favoritepost",
         ]
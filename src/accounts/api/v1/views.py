@@ -1,7 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.cache import cache
 from django.utils.encoding import smart_str
 from django.utils.http import urlsafe_base64_decode
 from rest_framework import generics, status
@@ -14,8 +13,12 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from accounts.models import Profile
+from accounts.selectors import get_profile
 from accounts.tasks import send_reset_password_email_task, send_verification_email_task
+from blog.api.v1.expansions import PostExpander, get_expansions
 from blog.api.v1.serializers import FavoritePostSerializer
+from blog.selectors import get_favorite_ids, get_favorite_posts
+from core.fieldsets import get_requested_fields
 
 from ...services import create_user, update_profile
 from ...utils import activate_user
@@ -171,7 +174,44 @@ class ChangePasswordView(generics.GenericAPIView):
         )
 
 
-class ProfileAPIView(generics.RetrieveUpdateAPIView):
+class ProfileReadMixin:
+    """
+    The steps of the profile that don't query the database or the cache, shared by
+    `ProfileAPIView` and its async twin in async_views.py.
+    """
+
+    def get_profile_context(self, request):
+        """
+        The requested fields, the `ProfileSerializer` context and the profile columns
+        the fields are read from.
+        """
+        fields = get_requested_fields(request)
+        context = {"request": request}
+        columns = None
+        if fields is not None:
+            # favoritepost is rendered by the view, not by ProfileSerializer
+            context["fields"] = [name for name in fields if name != "favoritepost"]
+            columns = ProfileSerializer(context=context).get_columns()
+        return fields, context, columns
+
+    def get_expander(self, request):
+        return PostExpander(
+            get_expansions(request, ("author", "category", "comments")), request
+        )
+
+    def get_favorites_data(self, request, favorite_posts, expander):
+        data = FavoritePostSerializer(
+            favorite_posts, many=True, context={"request": request}
+        ).data
+        if expander.expansions:
+            expander.expand_page(
+                [item["post"] for item in data],
+                [favorite.post for favorite in favorite_posts],
+            )
+        return data
+
+
+class ProfileAPIView(ProfileReadMixin, generics.RetrieveUpdateAPIView):
     """
     View for retrieving and updating a user's profile.
 
@@ -198,11 +238,7 @@ class ProfileAPIView(generics.RetrieveUpdateAPIView):
     """
 
     serializer_class = ProfileSerializer
-    queryset = (
-        Profile.objects.select_related("user")
-        .prefetch_related("favoritepost__post__category", "favoritepost__post__author")
-        .all()
-    )
+    queryset = Profile.objects.select_related("user").all()
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
@@ -211,19 +247,24 @@ class ProfileAPIView(generics.RetrieveUpdateAPIView):
         return obj
 
     def retrieve(self, request, *args, **kwargs):
-        profile = self.get_object()
-        favorite_post = cache.get(f"profile_{profile.id}_favorite_post")
-        if not favorite_post:
-            favorite_post = profile.favoritepost.all()
-            cache.set(f"profile_{profile.id}_favorite_post", favorite_post, timeout=300)
-        paginator = ProfileFavoritePostPagination()
-        page_obj = paginator.paginate_queryset(favorite_post, request=self.request)
-        serializer = ProfileSerializer(profile, context={"request": request})
-        data = serializer.data
+        fields, context, columns = self.get_profile_context(request)
+        profile = get_profile(request.user, columns=columns)
+        data = ProfileSerializer(profile, context=context).data
 
-        data["favoritepost"] = FavoritePostSerializer(
-            page_obj, many=True, context={"request": request}
-        ).data
+        paginator = ProfileFavoritePostPagination()
+        with_favorites = fields is None or "favoritepost" in fields
+        page = paginator.paginate_queryset(
+            get_favorite_ids(profile) if with_favorites else [],
+            request=self.request,
+        )
+        if with_favorites:
+            favorite_posts = get_favorite_posts(page)
+            expander = self.get_expander(request)
+            if expander.expansions:
+                expander.load([favorite.post for favorite in favorite_posts])
+            data["favoritepost"] = self.get_favorites_data(
+                request, favorite_posts, expander
+            )
         return paginator.get_paginated_response(data)
 
     def update(self, request, *args, **kwargs):
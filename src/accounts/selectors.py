@@ -0,0 +1,29 @@
+from django.http import Http404
+
+from accounts.models import Profile
+from core.fieldsets import project
+
+
+def _profile_queryset(columns):
+    queryset = Profile.objects.all()
+    if columns is None:
+        return queryset.select_related("user")
+    return project(queryset, columns)
+
+
+def get_profile(user, columns=None):
+    """
+    `columns` narrows the profile to the columns of the requested fields, the user is
+    only joined when one of them is read from it.
+    """
+    try:
+        return _profile_queryset(columns).get(user=user)
+    except Profile.DoesNotExist:
+        raise Http404("No Profile matches the given query.")
+
+
+async def aget_profile(user, columns=None):
+    try:
+        return await _profile_queryset(columns).aget(user=user)
+    except Profile.DoesNotExist:
+        raise Http404("No Profile matches the given query.")
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
+from blog.caches import ALL_POSTS_TAG, CATEGORIES_TAG, author_tag, invalidate_tags
+
 User = get_user_model()
 
 
@@ -23,4 +25,9 @@ def update_profile(instance, validated_data):
         setattr(instance, key, value)
         instance.save()
 
+    if user_data or validated_data:
+        # the author's name is rendered in every post listing, category listings
+        # included, and their profile with ?expand=author
+        invalidate_tags(ALL_POSTS_TAG, CATEGORIES_TAG, author_tag(user.id))
+
     return instance
@@ -0,0 +1,38 @@
+"""
+Micro benchmarks, run from src/ with e.g. `python -m benchmarks.serializers`.
+
+They use the project settings, so the environment of manage.py must be set.
+"""
+import os
+import timeit
+
+
+def setup_django():
+    """
+    Set up django as the test runner does, so requests from the test client are
+    accepted and no email leaves.
+    """
+    import django
+    from django.test.utils import setup_test_environment
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    django.setup()
+    setup_test_environment()
+
+
+def measure(function, repeat, number):
+    """
+    Best time of `repeat` runs of `number` calls, in seconds per call.
+    """
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number
+
+
+def report(results):
+    """
+    Print `results`, {name: seconds per call}, relative to the first entry.
+    """
+    width = max(len(name) for name in results)
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        speedup = baseline / seconds
+        print(f"{name:<{width}}  {seconds * 1e6:10.1f} us  {speedup:5.2f}x")
@@ -0,0 +1,237 @@
+"""
+Requests per second of the sync read path under gunicorn against the async one under
+uvicorn, with the same number of worker processes. Run from src/ with e.g.
+`python -m benchmarks.concurrency --workers 2 --concurrency 64`.
+
+Both servers are started on the database and redis of the environment, which must
+hold some published posts (`python manage.py insert_data`). Their memory is the summed
+RSS of the server and its workers, read from /proc after the run. The post list cache is
+disabled unless `--cache` is given, so the database is hit on every request.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+
+ENDPOINTS = {
+    "list": "posts/",
+    "detail": "posts/{slug}/",
+    "comments": "posts/{slug}/comments/",
+    "categories": "categories/",
+}
+
+
+def start_server(command, port, env):
+    process = subprocess.Popen(
+        command,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            # the workers boot after the port opens
+            time.sleep(2)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{command[0]} did not start on port {port}")
+
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=30)
+
+
+def get_rss(pid):
+    """
+    Resident memory of `pid` and its descendants, in bytes.
+    """
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+    return int(status_line.split()[1]), headers.get("connection", "").lower()
+
+
+async def client(port, paths, deadline, latencies, errors):
+    connection = None
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection("127.0.0.1", port)
+            reader, writer = connection
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                "Accept: application/json\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            errors.append(path)
+            connection = None
+            continue
+
+        if keep_alive == "close":
+            connection[1].close()
+            connection = None
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(path)
+
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(port, paths, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(client(port, paths, deadline, latencies, errors) for _ in range(concurrency))
+    )
+    return latencies, errors
+
+
+def run(name, command, port, env, paths, args):
+    process = start_server(command, port, env)
+    try:
+        # warm up the workers and their connections
+        asyncio.run(load(port, paths, args.concurrency, 2))
+        latencies, errors = asyncio.run(
+            load(port, paths, args.concurrency, args.duration)
+        )
+        rss = get_rss(process.pid)
+    finally:
+        stop_server(process)
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0]
+    return {
+        "name": name,
+        "requests_per_second": len(latencies) / args.duration,
+        "p50_ms": quantiles[49 if len(quantiles) > 49 else 0] * 1000,
+        "p99_ms": quantiles[-1] * 1000,
+        "errors": len(errors),
+        "rss_mb": rss / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument(
+        "--endpoint",
+        choices=ENDPOINTS,
+        action="append",
+        help="Endpoint to request, can be repeated. All of them by default",
+    )
+    parser.add_argument("--cache", action="store_true", help="Keep the list cache")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    setup_django()
+    from blog.models import Post
+
+    slug = (
+        Post.objects.filter(status=True)
+        .order_by("-published_at")
+        .values_list("slug", flat=True)
+        .first()
+    )
+    if slug is None:
+        sys.exit("No published posts, run `python manage.py insert_data` first.")
+
+    env = {
+        **os.environ,
+        "DEBUG": "False",
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+    }
+    if not args.cache:
+        env["POST_LIST_CACHE_TIMEOUT"] = "0"
+
+    endpoints = args.endpoint or list(ENDPOINTS)
+    servers = [
+        (
+            "gunicorn sync",
+            "/api/v1/blog/",
+            ["gunicorn", "core.wsgi:application", "-k", "sync"],
+        ),
+        (
+            "uvicorn async",
+            "/api/v1/async/blog/",
+            ["uvicorn", "core.asgi:application", "--no-access-log"],
+        ),
+    ]
+
+    results = []
+    for index, (name, prefix, command) in enumerate(servers):
+        port = args.port + index
+        if command[0] == "gunicorn":
+            command = [*command, "-w", str(args.workers), "-b", f"127.0.0.1:{port}"]
+        else:
+            command = [*command, "--workers", str(args.workers), "--port", str(port)]
+        paths = [
+            prefix + ENDPOINTS[endpoint].format(slug=slug) for endpoint in endpoints
+        ]
+        results.append(run(name, command, port, env, paths, args))
+
+    print(
+        f"{args.workers} workers, {args.concurrency} connections,"
+        f" {args.duration:g}s on {', '.join(endpoints)}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:<14} {result['requests_per_second']:8.1f} req/s"
+            f"  p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms"
+            f"  {result['rss_mb']:6.1f} MB  {result['errors']} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
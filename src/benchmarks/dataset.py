@@ -0,0 +1,27 @@
+"""
+The dataset of the endpoint benchmarks, seeded by the insert_data command: users with
+profiles, posts, comments, likes and favorites, with Zipf distributed popularity.
+
+The rows are added to whatever the database holds, so point POSTGRES_DB at a scratch
+database.
+"""
+
+
+def seed(
+    posts, users=None, comments_per_post=3, likes_per_user=20, favorites_per_user=5
+):
+    """
+    Insert `posts` posts and `users` users, posts // 10 by default, with their
+    comments, likes and favorites.
+    """
+    from django.core.management import call_command
+
+    users = users or max(posts // 10, 10)
+    call_command(
+        "insert_data",
+        users=users,
+        posts=posts,
+        comments=posts * comments_per_post,
+        likes=users * likes_per_user,
+        favorites=users * favorites_per_user,
+    )
@@ -0,0 +1,256 @@
+"""
+Latency and query count of the API endpoints on a large dataset, through the full
+middleware and view stack. Run from src/ with e.g.
+`python -m benchmarks.endpoints --seed 100000`.
+
+`--seed` first adds posts, with their comments, likes and favorites, until the
+database holds that many (see the insert_data command), so use a scratch database. The
+post list cache is disabled unless `--cache` is given, so every request reaches the
+database. The like and favorite toggles run an even number of times, which leaves the
+data as it was.
+
+The results are written as JSON to benchmarks/results/, or `--output`. `--compare`
+prints them next to an earlier run.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks import setup_django
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def get_scenarios():
+    """
+    {name: (method, path, authenticated)}, on a sample of the dataset.
+    """
+    from django.db.models import Count
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from blog.management.commands.insert_data import WORDS
+    from blog.models import FavoritePost, Post
+
+    post = (
+        Post.objects.filter(status=True)
+        .select_related("author", "category")
+        .annotate(comment_count=Count("comments"))
+        .order_by("-comment_count", "-published_at")
+        .first()
+    )
+    if post is None:
+        return None, {}
+
+    favorite = FavoritePost.objects.select_related("user__user").first()
+    user = favorite.user.user if favorite is not None else post.author
+    posts_url = reverse("blog:api-v1:posts-list")
+    post_url = reverse("blog:api-v1:posts-detail", kwargs={"slug": post.slug})
+    month_ago = (timezone.now() - timedelta(days=30)).date()
+
+    scenarios = {
+        "post list": ("get", posts_url, False),
+        "post list page 100": ("get", f"{posts_url}?page=100", False),
+        "post list cursor": ("get", f"{posts_url}?pagination=cursor", False),
+        "post list category": (
+            "get",
+            f"{posts_url}?category__name={post.category.name if post.category else ''}",
+            False,
+        ),
+        "post list author": (
+            "get",
+            f"{posts_url}?author__in={post.author.email}",
+            False,
+        ),
+        "post list created_at": (
+            "get",
+            f"{posts_url}?created_at__range={month_ago},",
+            False,
+        ),
+        "post list search": ("get", f"{posts_url}?search={WORDS[0]}", False),
+        "post list search headline": (
+            "get",
+            f"{posts_url}?search={WORDS[0]}&headline=true",
+            False,
+        ),
+        "post list expand": (
+            "get",
+            f"{posts_url}?expand=author,category,comments",
+            False,
+        ),
+        "post detail": ("get", post_url, False),
+        "comment list": ("get", f"{post_url}comments/", False),
+        "like toggle": ("post", f"{post_url}like/", True),
+        "favorite toggle": ("post", f"{post_url}favorite/", True),
+        "profile": ("get", reverse("accounts:api-v1:profile"), True),
+    }
+    return user, scenarios
+
+
+def run_scenario(client, method, path, warmup, number):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        getattr(client, method)(path)
+
+    timings, queries, statuses = [], [], set()
+    for _ in range(number):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = getattr(client, method)(path)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(context))
+        statuses.add(response.status_code)
+
+    percentiles = statistics.quantiles(timings, n=100)
+    return {
+        "path": path,
+        "method": method.upper(),
+        "number": number,
+        "status": sorted(statuses),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "max_ms": round(max(timings), 3),
+        "queries": statistics.median(queries),
+        "max_queries": max(queries),
+    }
+
+
+def get_meta(args):
+    import django
+    from django.conf import settings
+
+    from accounts.models import User
+    from blog.models import Comment, FavoritePost, Like, Post
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "dataset": {
+            "users": User.objects.count(),
+            "posts": Post.objects.count(),
+            "comments": Comment.objects.count(),
+            "likes": Like.objects.count(),
+            "favorites": FavoritePost.objects.count(),
+        },
+        "settings": {
+            "post_list_cache": args.cache,
+            "post_pagination_mode": settings.POST_PAGINATION_MODE,
+            "post_pagination_count": settings.POST_PAGINATION_COUNT,
+            "likes_write_behind": settings.LIKES_WRITE_BEHIND,
+            "request_metrics": settings.REQUEST_METRICS,
+            "database_engine": settings.DATABASES["default"]["ENGINE"],
+        },
+        "warmup": args.warmup,
+    }
+
+
+def print_results(results, baseline=None):
+    baseline = baseline or {}
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        line = (
+            f"{name:<{width}}  p50 {result['p50_ms']:8.2f} ms"
+            f"  p95 {result['p95_ms']:8.2f} ms  {result['queries']:4g} queries"
+        )
+        before = baseline.get(name)
+        if before is not None:
+            change = result["p50_ms"] / before["p50_ms"] - 1
+            line += (
+                f"  | before p50 {before['p50_ms']:8.2f} ms ({change:+.0%})"
+                f"  {before['queries']:4g} queries"
+            )
+        if result["status"] != [200]:
+            line += f"  status {result['status']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Posts the database should hold"
+    )
+    parser.add_argument("--number", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=4)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="Endpoint to measure, can be repeated. All of them by default",
+    )
+    parser.add_argument("--cache", action="store_true", help="Keep the list cache")
+    parser.add_argument("--output", type=Path, help="JSON file of the results")
+    parser.add_argument("--compare", type=Path, help="JSON file of an earlier run")
+    args = parser.parse_args()
+    # even, so the toggles end where they started
+    args.number += args.number % 2
+    args.warmup += args.warmup % 2
+
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    from benchmarks.dataset import seed
+    from blog.models import Post
+
+    existing = Post.objects.count()
+    if args.seed > existing:
+        seed(args.seed - existing)
+
+    if not args.cache:
+        settings.POST_LIST_CACHE_TIMEOUT = 0
+    cache.clear()
+
+    user, scenarios = get_scenarios()
+    if user is None:
+        parser.exit(1, "No published posts, run with --seed.\n")
+    unknown = set(args.scenario or []) - set(scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    anonymous, authenticated = APIClient(), APIClient()
+    authenticated.force_authenticate(user=user)
+    results = {}
+    for name, (method, path, needs_user) in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        client = authenticated if needs_user else anonymous
+        results[name] = run_scenario(client, method, path, args.warmup, args.number)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+    print_results(results, baseline)
+
+    meta = get_meta(args)
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{meta['commit'] or 'unknown'}.json"
+    output.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
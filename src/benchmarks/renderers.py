@@ -0,0 +1,89 @@
+"""
+DRF's `JSONRenderer` and `JSONParser` against the orjson and MessagePack ones, on a page
+of the post list and on a profile with its favorites.
+"""
+import argparse
+import io
+
+from benchmarks import measure, report, setup_django
+
+
+def build_payloads(items):
+    from benchmarks.serializers import build_page, make_request
+    from blog.api.v1.row_serializers import PostRowSerializer
+
+    _, rows = build_page(items)
+    request = make_request("/api/v1/blog/posts/")
+    post_list = {
+        "links": {"next": "http://testserver/api/v1/blog/posts/?page=2"},
+        "total_posts": 1000,
+        "total_pages": 100,
+        "results": PostRowSerializer({"request": request}).serialize(rows),
+    }
+    profile = {
+        "count": items,
+        "next": None,
+        "previous": None,
+        "results": {
+            "id": 1,
+            "email": "author@example.com",
+            "first_name": "A",
+            "last_name": "B",
+            "image": None,
+            "bio": "bio " * 100,
+            "birth_date": "1990-01-01",
+            "favoritepost": [
+                {
+                    "id": post["id"],
+                    "post": {
+                        key: post[key]
+                        for key in ("id", "author", "category", "title", "likes")
+                    },
+                }
+                for post in post_list["results"]
+            ],
+        },
+    }
+    return {"list": post_list, "profile": profile}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50, help="Posts per payload")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.parsers import MessagePackParser, ORJSONParser
+    from core.renderers import MessagePackRenderer, ORJSONRenderer
+
+    formats = [
+        ("JSONRenderer", JSONRenderer(), JSONParser()),
+        ("ORJSONRenderer", ORJSONRenderer(), ORJSONParser()),
+        ("MessagePackRenderer", MessagePackRenderer(), MessagePackParser()),
+    ]
+    for name, payload in build_payloads(args.items).items():
+        rendered = {}
+        for label, renderer, _ in formats:
+            rendered[label] = measure(
+                lambda: renderer.render(payload), args.repeat, args.number
+            )
+        print(f"render {name}:")
+        report(rendered)
+
+        parsed = {}
+        for label, renderer, parser in formats:
+            body = renderer.render(payload)
+            parsed[label] = measure(
+                lambda: parser.parse(io.BytesIO(body)), args.repeat, args.number
+            )
+        print(f"parse {name} ({len(body)} bytes as MessagePack):")
+        report(parsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+`PostSerializer` against `PostRowSerializer` on a page of the post list and on the
+post detail. Only serialization is measured, the posts and rows are built in memory.
+"""
+import argparse
+from collections import namedtuple
+from datetime import timedelta
+
+from benchmarks import measure, report, setup_django
+
+
+def build_page(size):
+    from django.utils import timezone
+
+    from accounts.models import User
+    from blog.models import Category, Post
+    from blog.selectors import POST_ROW_FIELDS
+
+    Row = namedtuple("Row", [*POST_ROW_FIELDS, "content"])
+    category = Category(id=1, name="Technology")
+    now = timezone.now()
+
+    posts, rows = [], []
+    for i in range(size):
+        author = User(
+            id=i, email=f"author{i}@example.com", first_name="A", last_name="B"
+        )
+        post = Post(
+            id=i,
+            author=author,
+            category=category,
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            content="content " * 200,
+            status=True,
+            image=f"posts/cover-{i}.jpg",
+            like_count=i,
+            created_at=now,
+            updated_at=now,
+            published_at=now - timedelta(minutes=i),
+        )
+        posts.append(post)
+        rows.append(
+            Row(
+                post.id,
+                author.first_name,
+                author.last_name,
+                category.name,
+                post.title,
+                post.slug,
+                post.status,
+                post.image.name,
+                post.like_count,
+                post.created_at,
+                post.updated_at,
+                post.published_at,
+                post.content,
+            )
+        )
+    return posts, rows
+
+
+def make_request(path, **kwargs):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    return Request(APIRequestFactory().get(path), parser_context={"kwargs": kwargs})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50, help="Posts per list page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from blog.api.v1.row_serializers import PostRowSerializer
+    from blog.api.v1.serializers import PostSerializer
+
+    posts, rows = build_page(args.items)
+    list_request = make_request("/api/v1/blog/posts/")
+    detail_request = make_request("/api/v1/blog/posts/post-0/", slug="post-0")
+
+    list_context = {"request": list_request}
+    detail_context = {"request": detail_request, "comments": []}
+    list_results = {
+        f"list PostSerializer ({args.items})": lambda: PostSerializer(
+            posts, many=True, context=list_context
+        ).data,
+        f"list PostRowSerializer ({args.items})": lambda: PostRowSerializer(
+            list_context
+        ).serialize(rows),
+    }
+    detail_results = {
+        "detail PostSerializer": lambda: PostSerializer(
+            posts[0], context=detail_context
+        ).data,
+        "detail PostRowSerializer": lambda: PostRowSerializer(
+            detail_context, detail=True
+        ).to_representation(rows[0]),
+    }
+    for results in (list_results, detail_results):
+        report(
+            {
+                name: measure(function, args.repeat, args.number)
+                for name, function in results.items()
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from django.urls import path
+
+from . import async_views
+
+app_name = "blog-async"
+
+urlpatterns = [
+    path("posts/", async_views.AsyncPostListView.as_view(), name="posts-list"),
+    path(
+        "posts/<str:slug>/",
+        async_views.AsyncPostDetailView.as_view(),
+        name="posts-detail",
+    ),
+    path(
+        "posts/<str:post_slug>/comments/",
+        async_views.AsyncCommentListView.as_view(),
+        name="comments-list",
+    ),
+    path(
+        "categories/",
+        async_views.AsyncCategoryListView.as_view(),
+        name="categories-list",
+    ),
+]
@@ -0,0 +1,160 @@
+"""
+Async twins of the read endpoints in views.py, served under /api/v1/async/blog/.
+
+They answer with the same payloads and validators, through the same selectors, caches
+and serializers. Queries and cache reads are awaited with the async ORM and cache API.
+The steps without an async twin run in a thread: filtered listing tags, pending likes,
+search headlines and expansions.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+
+from blog import pending_likes
+from blog.caches import (
+    acache_post_list,
+    aget_cached_post_list,
+    aget_tag_versions,
+    get_post_list_cache_key,
+    get_post_list_tags,
+)
+from blog.models import Category, Post
+from blog.selectors import (
+    aget_comments,
+    aget_post_row,
+    aget_post_validators,
+    get_post_headlines,
+)
+from core.async_views import AsyncAPIView
+from core.fieldsets import get_requested_fields
+
+from .conditionals import (
+    get_not_modified_response,
+    get_post_detail_tags,
+    get_post_detail_validators,
+    set_validators,
+)
+from .paginations import (
+    PostCommentPagination,
+    PostPagination,
+    get_post_pagination_class,
+)
+from .permissions import CommentUserOrReadOnly, IsAdminUserOrReadOnly
+from .serializers import CategorySerializer, CommentSerializer
+from .views import PostReadMixin
+
+
+class AsyncPostListView(PostReadMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    async def get(self, request):
+        filters = self.get_filters(request)
+
+        pagination_class = get_post_pagination_class(request)
+        cache_key = get_post_list_cache_key(request, filters, pagination_class)
+        entry = await aget_cached_post_list(cache_key)
+        if entry is not None:
+            return self.get_list_response(request, cache_key, entry)
+
+        serializer, expander = self.get_list_serializers(request, filters)
+        try:
+            queryset = self.get_list_queryset(filters, serializer, expander)
+        except Exception as ex:
+            return Response(
+                {"detail": "Filter Error - " + str(ex)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tag_versions = await aget_tag_versions(
+            await sync_to_async(get_post_list_tags)(filters)
+        )
+        paginator = pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        if pending_likes.is_enabled():
+            page = await sync_to_async(pending_likes.merge_pending_likes)(page)
+
+        if "headline" in serializer.fields:
+            serializer.headlines.update(
+                await sync_to_async(get_post_headlines)(
+                    [post.id for post in page], filters["search"]
+                )
+            )
+
+        data = serializer.serialize(page)
+        if expander.expansions:
+            await sync_to_async(expander.load)(page)
+            expander.expand_page(data, page)
+        response = paginator.get_paginated_response(data)
+        entry = await acache_post_list(cache_key, response.data, tag_versions, page)
+        return self.get_list_response(request, cache_key, entry, response)
+
+
+class AsyncPostDetailView(PostReadMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    async def get(self, request, slug):
+        try:
+            validators = await aget_post_validators(slug)
+        except Post.DoesNotExist:
+            return Response(
+                {"detail": "Post does not exist"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        tags = await aget_tag_versions(get_post_detail_tags(validators))
+        etag, last_modified = get_post_detail_validators(request, validators, tags)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer, expander = self.get_detail_serializers(request)
+        try:
+            post = await aget_post_row(
+                slug, columns=[*serializer.columns, *expander.columns]
+            )
+        except Post.DoesNotExist:
+            return Response(
+                {"detail": "Post does not exist"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if pending_likes.is_enabled():
+            (post,) = await sync_to_async(pending_likes.merge_pending_likes)([post])
+
+        paginator = PostCommentPagination()
+        comments = await paginator.apaginate_queryset(
+            self.get_comment_rows(serializer, post), request=request
+        )
+
+        data = serializer.to_representation(post, comments)
+        if expander.expansions:
+            await sync_to_async(expander.load)([post])
+            expander.expand(data, post)
+        response = paginator.get_paginated_response(data)
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncCommentListView(AsyncAPIView):
+    permission_classes = [CommentUserOrReadOnly]
+
+    async def get(self, request, post_slug):
+        context = {"request": request, "fields": get_requested_fields(request)}
+        columns = None
+        if context["fields"] is not None:
+            columns = CommentSerializer(context=context).get_columns()
+        queryset = await aget_comments(post_slug=post_slug, columns=columns)
+
+        paginator = PostPagination()
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = CommentSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AsyncCategoryListView(AsyncAPIView):
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    async def get(self, request):
+        paginator = PostPagination()
+        page = await paginator.apaginate_queryset(
+            Category.objects.all(), request, view=self
+        )
+        serializer = CategorySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,79 @@
+"""
+Validators for conditional GET (`If-None-Match` / `If-Modified-Since`) on the posts.
+
+They are derived from data that is cheap to read, the cache tag versions and a few
+`Post` columns, so a matching request is answered with 304 before the selectors and
+serializers run.
+"""
+import hashlib
+import json
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from blog.caches import (
+    author_tag,
+    category_tag,
+    get_tag_versions,
+    post_tag,
+    tag_version_to_timestamp,
+)
+
+
+def make_etag(request, *parts):
+    """
+    A strong ETag over `parts` and everything else the rendered body depends on: the
+    absolute url, which appears in links, and the negotiated media type.
+    """
+    signature = [request.build_absolute_uri(), request.META.get("HTTP_ACCEPT", "")]
+    digest = hashlib.sha1(
+        json.dumps([*signature, *parts], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def get_post_list_validators(request, cache_key, entry):
+    etag = make_etag(request, cache_key, entry["tags"])
+    return etag, entry["last_modified"]
+
+
+def get_post_detail_tags(post):
+    return [
+        post_tag(post["id"]),
+        author_tag(post["author_id"]),
+        category_tag(post["category_id"]),
+    ]
+
+
+def get_post_detail_validators(request, post, tags=None):
+    """
+    `post` holds the columns returned by `get_post_validators`. Likes and comments are
+    covered by the post tag, author and category names by theirs. `tags` are the
+    versions of `get_post_detail_tags`, read here if not given.
+    """
+    if tags is None:
+        tags = get_tag_versions(get_post_detail_tags(post))
+    etag = make_etag(request, post["id"], post["like_count"], post["updated_at"], tags)
+    last_modified = max(
+        int(post["updated_at"].timestamp()),
+        *(tag_version_to_timestamp(version) for version in tags.values()),
+    )
+    return etag, last_modified
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    Returns a 304 response if the client's copy is current, otherwise None.
+    """
+    response = get_conditional_response(
+        request._request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
@@ -0,0 +1,135 @@
+"""
+`?expand=author,category,comments[:k]` embeds related resources in the post payloads.
+
+- `author`: the author with their profile instead of the full name.
+- `category`: the category as an object instead of its name.
+- `comments[:k]`: the `k` newest comments of the post, `DEFAULT_COMMENTS` without `k`.
+
+Every expansion is one batched query over the posts of the page, so the number of
+queries doesn't grow with the page size.
+"""
+import re
+
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Profile
+from blog.selectors import get_author_profiles, get_categories, get_latest_comment_rows
+
+from .row_serializers import AbsoluteUriBuilder, CommentRowSerializer
+
+EXPAND_QUERY_PARAM = "expand"
+DEFAULT_COMMENTS = 3
+MAX_COMMENTS = 10
+
+EXPANSION_PATTERN = re.compile(r"(?P<name>\w+)(?:\[:(?P<limit>\d+)\])?")
+
+
+def get_expansions(request, allowed):
+    """
+    {name: limit} for `?expand=`, limit being None for anything but comments. Names not
+    in `allowed` are a 400.
+    """
+    value = request.query_params.get(EXPAND_QUERY_PARAM)
+    if not value:
+        return {}
+
+    expansions = {}
+    for item in value.split(","):
+        match = EXPANSION_PATTERN.fullmatch(item.strip())
+        if match is None or match["name"] not in allowed:
+            raise ValidationError(
+                {EXPAND_QUERY_PARAM: f"Choose from {', '.join(allowed)}."}
+            )
+
+        name, limit = match["name"], match["limit"]
+        if name != "comments":
+            if limit is not None:
+                raise ValidationError({EXPAND_QUERY_PARAM: f"{name} takes no limit."})
+            expansions[name] = None
+            continue
+
+        limit = DEFAULT_COMMENTS if limit is None else int(limit)
+        if not 0 < limit <= MAX_COMMENTS:
+            raise ValidationError(
+                {EXPAND_QUERY_PARAM: f"Embed 1 to {MAX_COMMENTS} comments."}
+            )
+        expansions[name] = limit
+    return expansions
+
+
+class PostExpander:
+    """
+    Loads the expansions of a page of posts, selector rows or `Post` instances, with
+    `load` and embeds them in the payload of each post with `expand`.
+    """
+
+    # the post columns the expansions are loaded from
+    expansion_columns = {
+        "author": ("author_id",),
+        "category": ("category_id",),
+        "comments": ("title",),
+    }
+
+    def __init__(self, expansions, request):
+        self.expansions = expansions
+        self.build_absolute_uri = AbsoluteUriBuilder(request)
+        self.storage = Profile._meta.get_field("image").storage
+        self.authors = {}
+        self.categories = {}
+        self.comments = {}
+
+    @property
+    def columns(self):
+        columns = ["id"]
+        for name in self.expansions:
+            columns += self.expansion_columns[name]
+        return columns
+
+    def load(self, posts):
+        if "author" in self.expansions:
+            self.authors = get_author_profiles({post.author_id for post in posts})
+        if "category" in self.expansions:
+            self.categories = get_categories(
+                {post.category_id for post in posts} - {None}
+            )
+        if "comments" in self.expansions:
+            self.comments = {post.id: [] for post in posts}
+            for comment in get_latest_comment_rows(
+                self.comments, self.expansions["comments"]
+            ):
+                self.comments[comment.comment_post_id].append(comment)
+
+    def expand(self, data, post):
+        if "author" in self.expansions:
+            data["author"] = self.get_author(post.author_id)
+        if "category" in self.expansions:
+            name = self.categories.get(post.category_id)
+            data["category"] = (
+                None if name is None else {"id": post.category_id, "name": name}
+            )
+        if "comments" in self.expansions:
+            data["comments"] = CommentRowSerializer(post.title).serialize(
+                self.comments[post.id]
+            )
+        return data
+
+    def expand_page(self, data, posts):
+        for item, post in zip(data, posts):
+            self.expand(item, post)
+        return data
+
+    def get_author(self, user_id):
+        profile = self.authors.get(user_id)
+        if profile is None:
+            return None
+        return {
+            "id": user_id,
+            "first_name": profile.user__first_name,
+            "last_name": profile.user__last_name,
+            "image": (
+                self.build_absolute_uri(self.storage.url(profile.image))
+                if profile.image
+                else None
+            ),
+            "bio": profile.bio,
+        }
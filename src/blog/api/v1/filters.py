@@ -1,4 +1,5 @@
-from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
 from django.utils import timezone
 from django_filters import CharFilter, FilterSet
 from rest_framework.exceptions import APIException
@@ -21,7 +22,6 @@ class PostFilter(FilterSet):
         return queryset.filter(category__name__icontains=value)
 
     def filter_author__in(self, queryset, name, value):
-        print(value)
         """
         **value**:
             in this endpoint value is john and amy
@@ -53,7 +53,13 @@ class PostFilter(FilterSet):
         return queryset.filter(created_at__date__range=(created_at_0, created_at_1))
 
     def filter_search(self, queryset, name, value):
-        print(queryset)
-        return queryset.annotate(search=SearchVector("title", config="simple")).filter(
-            search=value
+        """
+        Matches against the stored, GIN indexed `Post.search_vector` and returns the
+        best ranked posts first.
+        """
+        query = SearchQuery(value, config="simple")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "-published_at", "-id")
         )
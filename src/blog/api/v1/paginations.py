@@ -1,12 +1,254 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import OrderedDict
+from functools import partial
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
 from rest_framework.pagination import LimitOffsetPagination as _LimitOffsetPagination
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class LookaheadPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class LookaheadPaginator(DjangoPaginator):
+    """
+    A page fetches one extra row to learn whether there is a next page, instead of
+    comparing its number to `num_pages`. Any positive page is accepted, so a total that
+    is too low, or gone stale, can't hide the last pages.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+
+        return LookaheadPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
+
+
+class CountedPaginator(LookaheadPaginator):
+    """
+    A paginator whose total comes from `count_function`, which may return an estimate.
+    """
+
+    def __init__(self, object_list, per_page, count_function, **kwargs):
+        self.count_function = count_function
+        super().__init__(object_list, per_page, **kwargs)
+
+    @cached_property
+    def count(self):
+        return self.count_function(self.object_list)
+
+
+class UncountedPaginator(LookaheadPaginator):
+    """
+    A paginator without any total. `num_pages` only covers the pages known so far.
+    """
+
+    known_pages = 1
+
+    @property
+    def count(self):
+        return None
+
+    @property
+    def num_pages(self):
+        return self.known_pages
+
+    def page(self, number):
+        page = super().page(number)
+        self.known_pages = page.number + page.has_next()
+        return page
 
 
 class PostPagination(PageNumberPagination):
+    """
+    `total_posts` and `total_pages` come from a count strategy, `count_strategy` or the
+    `POST_PAGINATION_COUNT` setting, implemented by the `count_<strategy>` method:
+
+    - exact: `COUNT(*)` on every request.
+    - cached: exact count cached per filter signature for `POST_PAGINATION_COUNT_CACHE_TIMEOUT`.
+    - estimate: the planner's row estimate, exact below `POST_PAGINATION_ESTIMATE_THRESHOLD`.
+    - omitted: no totals and no count query at all.
+    """
+
     page_size = 10
+    count_strategy = None
+    count_strategies = ("exact", "cached", "estimate", "omitted")
+
+    def get_count_strategy(self):
+        strategy = self.count_strategy or settings.POST_PAGINATION_COUNT
+        if strategy not in self.count_strategies:
+            raise ImproperlyConfigured(
+                f"POST_PAGINATION_COUNT must be one of"
+                f" {', '.join(self.count_strategies)}, not {strategy!r}."
+            )
+        return strategy
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count_is_estimate = False
+        strategy = self.get_count_strategy()
+
+        if strategy == "omitted":
+            self.django_paginator_class = UncountedPaginator
+        else:
+            self.django_paginator_class = partial(
+                CountedPaginator, count_function=getattr(self, f"count_{strategy}")
+            )
+        return super().paginate_queryset(queryset, request, view=view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Django's paginator and the count strategies are sync, the page and its count are
+        read in a thread.
+        """
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def count_exact(self, queryset):
+        return queryset.count()
+
+    def count_cached(self, queryset):
+        params = sorted(
+            (name, value)
+            for name, value in self.request.query_params.items()
+            if name not in (self.page_query_param, self.page_size_query_param)
+        )
+        digest = hashlib.sha1(
+            json.dumps([self.request.path, params]).encode()
+        ).hexdigest()
+        key = f"blog:count:{digest}"
+
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=settings.POST_PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def count_estimate(self, queryset):
+        """
+        Above the threshold an exact count costs a scan while the estimate, taken from
+        `EXPLAIN`, is free. Below it the estimate is too coarse to show.
+        """
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        estimate = plan[0]["Plan"]["Plan Rows"]
+        if estimate < settings.POST_PAGINATION_ESTIMATE_THRESHOLD:
+            return queryset.count()
+
+        self.count_is_estimate = True
+        return estimate
+
+    def get_paginated_response(self, data):
+        response = {
+            "links": {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+            },
+        }
+        if self.page.paginator.count is not None:
+            response["total_posts"] = self.page.paginator.count
+            response["total_pages"] = self.page.paginator.num_pages
+            if self.count_is_estimate:
+                response["total_is_estimate"] = True
+        response["results"] = data
+
+        return Response(response)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite key, e.g. `(published_at, id)`.
+
+    Unlike `PageNumberPagination` there is no `OFFSET` and no `COUNT(*)`: every page is a
+    `WHERE (key) < (cursor) ORDER BY key LIMIT page_size + 1` query. The cursor is an opaque
+    base64 token holding the key of the boundary row and the direction.
+
+    All `ordering` fields must share the same direction, and the last one must be unique.
+    """
+
+    page_size = 10
+    cursor_query_param = "cursor"
+    ordering = ("-published_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page([item async for item in queryset], position, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        The page with one extra row past it, and the cursor it starts at.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            position, reverse = None, False
+        else:
+            position, reverse = cursor
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position, reverse))
+        return queryset[: self.page_size + 1], position, reverse
+
+    def set_page(self, results, position, reverse):
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        return self.page
 
     def get_paginated_response(self, data):
         return Response(
@@ -15,12 +257,125 @@ class PostPagination(PageNumberPagination):
                     "next": self.get_next_link(),
                     "previous": self.get_previous_link(),
                 },
-                "total_posts": self.page.paginator.count,
-                "total_pages": self.page.paginator.num_pages,
                 "results": data,
             }
         )
 
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    @property
+    def descending(self):
+        return self.ordering[0].startswith("-")
+
+    @property
+    def key_fields(self):
+        return [field.lstrip("-") for field in self.ordering]
+
+    def get_ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    def get_position(self, item):
+        return [getattr(item, field) for field in self.key_fields]
+
+    def get_position_filter(self, position, reverse):
+        """
+        Expand the row comparison `(a, b) < (x, y)` into `a < x OR (a = x AND b < y)`.
+        """
+        lookup = "lt" if self.descending != reverse else "gt"
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.key_fields, position):
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
+
+    def encode_cursor(self, position, reverse):
+        token = json.dumps(
+            {
+                "p": [
+                    value.isoformat() if hasattr(value, "isoformat") else value
+                    for value in position
+                ],
+                "r": int(reverse),
+            },
+            separators=(",", ":"),
+        )
+        encoded = urlsafe_b64encode(token.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            token = json.loads(urlsafe_b64decode(padded.encode()))
+            position = [
+                parse_datetime(value) if isinstance(value, str) else value
+                for value in token["p"]
+            ]
+            reverse = bool(token["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if len(position) != len(self.key_fields) or None in position:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+
+class PostCursorPagination(KeysetPagination):
+    page_size = 10
+    ordering = ("-published_at", "-id")
+
+
+POST_PAGINATION_CLASSES = {
+    "page": PostPagination,
+    "cursor": PostCursorPagination,
+}
+
+
+def get_post_pagination_class(request):
+    """
+    Pick the pagination for the post list. `?pagination=cursor|page` wins over the
+    `POST_PAGINATION_MODE` setting, and a request that already carries a `cursor` is
+    always paginated by cursor.
+
+    A search is ordered by rank, which the cursor doesn't key on, so it is paginated
+    by page: the setting falls back to page, and asking for a cursor is rejected.
+    """
+    mode = request.query_params.get("pagination")
+    if request.query_params.get(PostCursorPagination.cursor_query_param):
+        mode = "cursor"
+
+    if request.query_params.get("search"):
+        if mode == "cursor":
+            raise ValidationError(
+                {"pagination": "Search results can only be paginated by page."}
+            )
+        mode = mode or "page"
+
+    try:
+        return POST_PAGINATION_CLASSES[mode or settings.POST_PAGINATION_MODE]
+    except KeyError:
+        raise ValidationError(
+            {"pagination": f"Choose one of {', '.join(POST_PAGINATION_CLASSES)}."}
+        )
+
 
 def get_paginated_response(
     *, pagination_class, serializer_class, queryset, request, view
@@ -39,17 +394,18 @@ def get_paginated_response(
 
 
 def get_paginated_response_context(
-    *, pagination_class, serializer_class, queryset, request, view
+    *, pagination_class, serializer_class, queryset, request, view, context=None
 ):
     paginator = pagination_class()
+    context = {"request": request, **(context or {})}
 
     page = paginator.paginate_queryset(queryset, request, view=view)
 
     if page is not None:
-        serializer = serializer_class(page, many=True, context={"request": request})
+        serializer = serializer_class(page, many=True, context=context)
         return paginator.get_paginated_response(serializer.data)
 
-    serializer = serializer_class(queryset, many=True, context={"request": request})
+    serializer = serializer_class(queryset, many=True, context=context)
 
     return Response(data=serializer.data)
 
@@ -89,17 +445,22 @@ class LimitOffsetPagination(_LimitOffsetPagination):
         )
 
 
-class PostCommentPagination(PageNumberPagination):
+class PostCommentPagination(KeysetPagination):
+    """
+    Comments of the post detail, oldest first. Only the requested window of comments is
+    read, so a post with many comments costs the same as one with a few.
+    """
+
     page_size = 2
+    ordering = ("created_at", "id")
 
-    # def get_paginated_response(self, data):
-    #     return Response(
-    #         OrderedDict(
-    #             [
-    #                 ("count", self.page.paginator.count),
-    #                 ("next", self.get_next_link()),
-    #                 ("previous", self.get_previous_link()),
-    #                 ("results", data),
-    #             ]
-    #         )
-    #     )
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
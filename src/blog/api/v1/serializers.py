@@ -1,13 +1,16 @@
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
 from blog.models import Category, Comment, Post, FavoritePost
+from core.fieldsets import SparseFieldsetMixin
+from core.metrics import SerializeMetricsMixin
 
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SerializeMetricsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = [
@@ -16,18 +19,25 @@ class CategorySerializer(serializers.ModelSerializer):
         ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    SerializeMetricsMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     comment_user = serializers.StringRelatedField()
     comment_post = serializers.StringRelatedField()
 
+    field_columns = {
+        "comment_user": ("comment_user__email",),
+        "comment_post": ("comment_post__title",),
+    }
+
     class Meta:
         model = Comment
         fields = ["id", "comment_user", "comment_post", "comment", "created_at"]
         read_only_fields = ["created_at"]
 
 
-class PostSerializer(serializers.ModelSerializer):
-    likes = serializers.IntegerField(read_only=True)
+class PostSerializer(SerializeMetricsMixin, serializers.ModelSerializer):
+    likes = serializers.IntegerField(source="like_count", read_only=True)
     absolute_url = serializers.SerializerMethodField(read_only=True)
 
     author = serializers.SlugRelatedField(slug_field="full_name", read_only=True)
@@ -37,27 +47,53 @@ class PostSerializer(serializers.ModelSerializer):
         slug_field="id",
     )
 
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField(read_only=True)
 
     def get_absolute_url(self, obj):
         request = self.context.get("request")
         if obj:
             return request.build_absolute_uri(obj.slug)
 
-    def to_representation(self, instance):
-
-        rep = super().to_representation(instance)
+    @swagger_serializer_method(serializer_or_field=CommentSerializer(many=True))
+    def get_comments(self, obj):
+        """
+        The post detail passes its page of comments in the context, anything else gets
+        all of them.
+        """
+        comments = self.context.get("comments")
+        if comments is None:
+            comments = obj.comments.all()
+        return CommentSerializer(comments, many=True).data
+
+    def get_hidden_fields(self):
+        """
+        The detail payload has no absolute_url and the list payload has no content and
+        comments. They are skipped before representation rather than popped after it,
+        so the list never touches the deferred `content` column.
+        """
         request = self.context.get("request")
 
         if request.parser_context.get("kwargs").get("slug"):
+            return {"absolute_url"}
+        return {"content", "comments"}
 
-            rep.pop("absolute_url", None)
-        else:
-            rep.pop("content", None)
-            rep.pop("comments", None)
+    @property
+    def _readable_fields(self):
+        hidden_fields = self.get_hidden_fields()
+        for field in super()._readable_fields:
+            if field.field_name not in hidden_fields:
+                yield field
+
+    def to_representation(self, instance):
+
+        rep = super().to_representation(instance)
 
         rep["category"] = CategorySerializer(instance.category).data["name"]
 
+        headlines = self.context.get("headlines")
+        if headlines is not None:
+            rep["headline"] = headlines.get(instance.id)
+
         return rep
 
     class Meta:
@@ -91,10 +127,28 @@ class FilterSerializer(serializers.Serializer):
     author__in = serializers.CharField(required=False, max_length=100)
     category__name = serializers.CharField(required=False, max_length=100)
     created_at__range = serializers.CharField(required=False, max_length=100)
+    # not a filter: asks for ts_headline snippets of the search matches
+    headline = serializers.BooleanField(required=False)
+
+
+class LikeBatchSerializer(serializers.Serializer):
+    """
+    Posts of a batch like request, by slug.
+    """
+
+    max_slugs = 50
+
+    slugs = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False, max_length=max_slugs
+    )
+
+    def validate_slugs(self, slugs):
+        # keep the order of the request, without duplicates
+        return list(dict.fromkeys(slugs))
 
 
-class SimplePostSerializer(serializers.ModelSerializer):
-    likes = serializers.IntegerField(read_only=True)
+class SimplePostSerializer(SerializeMetricsMixin, serializers.ModelSerializer):
+    likes = serializers.IntegerField(source="like_count", read_only=True)
     absolute_url = serializers.SerializerMethodField(read_only=True)
 
     author = serializers.SlugRelatedField(slug_field="full_name", read_only=True)
@@ -121,7 +175,7 @@ class SimplePostSerializer(serializers.ModelSerializer):
         read_only_fields = ["absolute_url"]
 
 
-class FavoritePostSerializer(serializers.ModelSerializer):
+class FavoritePostSerializer(SerializeMetricsMixin, serializers.ModelSerializer):
     post = SimplePostSerializer(read_only=True)
 
     class Meta:
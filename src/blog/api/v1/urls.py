@@ -9,6 +9,7 @@ router = DefaultRouter()
 
 router.register("posts", views.PostViewSet, basename="posts")
 router.register("categories", views.CategoryViewSet, basename="categories")
+router.register("likes", views.LikeBatchViewSet, basename="likes")
 # router.register("comments", views.CommentViewSet, basename="comments")
 
 posts_router = routers.NestedDefaultRouter(router, "posts", lookup="post")
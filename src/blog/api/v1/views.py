@@ -3,41 +3,139 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db import IntegrityError
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ViewSet
 
-from accounts.models import Profile
-from blog.models import Category, Comment, Like, Post, FavoritePost
-from blog.selectors import get_comment, get_comments, get_post, get_posts
+from blog import pending_likes
+from blog.caches import (
+    cache_post_list,
+    get_cached_post_list,
+    get_post_list_cache_key,
+    get_post_list_tags,
+    get_tag_versions,
+)
+from blog.models import Category, Comment, Post
+from blog.selectors import (
+    get_comment,
+    get_comments,
+    get_like_status,
+    get_post,
+    get_post_comment_rows,
+    get_post_row,
+    get_post_rows,
+    get_post_headlines,
+    get_post_validators,
+)
 from blog.services import (
     create_comment,
     create_post,
     delete_comment,
     delete_post,
+    buffer_like_toggles,
+    toggle_favorite,
+    toggle_like,
+    toggle_likes,
     update_comment,
     update_post,
 )
 
+from core.fieldsets import get_requested_fields
+
+from .conditionals import (
+    get_not_modified_response,
+    get_post_detail_validators,
+    get_post_list_validators,
+    set_validators,
+)
+from .expansions import PostExpander, get_expansions
 from .paginations import (
     PostCommentPagination,
     PostPagination,
     get_paginated_response,
     get_paginated_response_context,
+    get_post_pagination_class,
 )
 from .permissions import CommentUserOrReadOnly, IsAdminUserOrReadOnly, IsOwnerOrReadOnly
+from .row_serializers import PostRowSerializer
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
     FilterSerializer,
+    LikeBatchSerializer,
     PostSerializer,
 )
 
 User = get_user_model()
 
 
-class PostViewSet(ViewSet):
+class PostReadMixin:
+    """
+    The steps of the post list and detail that don't query the database or the cache,
+    shared by `PostViewSet` and its async twins in async_views.py.
+    """
+
+    def get_filters(self, request):
+        filter_serializer = FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        return filter_serializer.validated_data
+
+    def get_list_response(self, request, cache_key, entry, response=None):
+        """
+        Answer a conditional request with a 304 whether or not `entry` came from the
+        cache. `response` is the freshly built page on a cache miss.
+        """
+        etag, last_modified = get_post_list_validators(request, cache_key, entry)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        if response is None:
+            response = Response(entry["data"])
+        return set_validators(response, etag, last_modified)
+
+    def get_list_serializers(self, request, filters):
+        """
+        The serializer and expander of the page. They are built before the query, which
+        only reads the columns they need.
+        """
+        context = {"request": request, "fields": get_requested_fields(request)}
+        if filters.get("search") and filters.get("headline"):
+            # filled in once the page is known
+            context["headlines"] = {}
+        serializer = PostRowSerializer(context)
+        expander = PostExpander(
+            get_expansions(request, ("author", "category", "comments")), request
+        )
+        return serializer, expander
+
+    def get_list_queryset(self, filters, serializer, expander):
+        queryset = get_post_rows(
+            filters=filters, columns=[*serializer.columns, *expander.columns]
+        )
+        if not queryset.ordered:
+            # newest first, the order of blog_post_published_idx
+            queryset = queryset.order_by("-published_at", "-id")
+        return queryset
+
+    def get_detail_serializers(self, request):
+        serializer = PostRowSerializer(
+            {"request": request, "fields": get_requested_fields(request)}, detail=True
+        )
+        # the detail already embeds a page of comments
+        expander = PostExpander(
+            get_expansions(request, ("author", "category")), request
+        )
+        return serializer, expander
+
+    def get_comment_rows(self, serializer, post):
+        if "comments" in serializer.fields:
+            return get_post_comment_rows(post.id)
+        return Comment.objects.none()
+
+
+class PostViewSet(PostReadMixin, ViewSet):
     # queryset = get_posts()
     serializer_class = PostSerializer
     lookup_field = "slug"
@@ -46,24 +144,42 @@ class PostViewSet(ViewSet):
 
     def list(self, request):
         request = self.request
-        filter_serializer = FilterSerializer(data=request.query_params)
-        filter_serializer.is_valid(raise_exception=True)
+        filters = self.get_filters(request)
+
+        pagination_class = get_post_pagination_class(request)
+        cache_key = get_post_list_cache_key(request, filters, pagination_class)
+        entry = get_cached_post_list(cache_key)
+        if entry is not None:
+            return self.get_list_response(request, cache_key, entry)
 
+        serializer, expander = self.get_list_serializers(request, filters)
         try:
-            queryset = get_posts(filters=filter_serializer.validated_data)
+            queryset = self.get_list_queryset(filters, serializer, expander)
         except Exception as ex:
             return Response(
                 {"detail": "Filter Error - " + str(ex)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        return get_paginated_response_context(
-            pagination_class=PostPagination,
-            serializer_class=PostSerializer,
-            queryset=queryset,
-            request=request,
-            view=self,
+
+        tag_versions = get_tag_versions(get_post_list_tags(filters))
+        paginator = pagination_class()
+        page = pending_likes.merge_pending_likes(
+            paginator.paginate_queryset(queryset, request, view=self)
         )
 
+        if "headline" in serializer.fields:
+            serializer.headlines.update(
+                get_post_headlines([post.id for post in page], filters["search"])
+            )
+
+        data = serializer.serialize(page)
+        if expander.expansions:
+            expander.load(page)
+            expander.expand_page(data, page)
+        response = paginator.get_paginated_response(data)
+        entry = cache_post_list(cache_key, response.data, tag_versions, page)
+        return self.get_list_response(request, cache_key, entry, response)
+
     # @swagger_auto_schema(request_body=PostSerializer, response=PostSerializer)
     def partial_update(self, request, slug):
         post = Post.objects.get(slug=slug)
@@ -90,20 +206,38 @@ class PostViewSet(ViewSet):
     def retrieve(self, request, slug):
 
         try:
-            post = get_post(slug)
+            validators = get_post_validators(slug)
         except Post.DoesNotExist:
             return Response(
                 {"detail": "Post does not exist"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        etag, last_modified = get_post_detail_validators(request, validators)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer, expander = self.get_detail_serializers(request)
+        try:
+            post = get_post_row(slug, columns=[*serializer.columns, *expander.columns])
+        except Post.DoesNotExist:
+            return Response(
+                {"detail": "Post does not exist"}, status=status.HTTP_404_NOT_FOUND
+            )
+        (post,) = pending_likes.merge_pending_likes([post])
+
         # Pagination for Post's comments
-        comments = post.comments.all()
-        paginator = PostCommentPagination()  # 10 comments per page
-        page_obj = paginator.paginate_queryset(comments, request=self.request)
-        serializer = PostSerializer(post, context={"request": request})
-        data = serializer.data
-        data["comments"] = CommentSerializer(page_obj, many=True).data
-        return paginator.get_paginated_response(data)
+        paginator = PostCommentPagination()
+        comments = paginator.paginate_queryset(
+            self.get_comment_rows(serializer, post), request=self.request
+        )
+
+        data = serializer.to_representation(post, comments)
+        if expander.expansions:
+            expander.load([post])
+            expander.expand(data, post)
+        response = paginator.get_paginated_response(data)
+        return set_validators(response, etag, last_modified)
 
     def destroy(self, request, slug):
         self.check_object_permissions(request, get_post(slug))
@@ -147,7 +281,11 @@ class CommentViewSet(ViewSet):
     permission_classes = [CommentUserOrReadOnly]
 
     def list(self, request, post_slug):
-        queryset = get_comments(post_slug=post_slug)
+        context = {"fields": get_requested_fields(request)}
+        columns = None
+        if context["fields"] is not None:
+            columns = CommentSerializer(context=context).get_columns()
+        queryset = get_comments(post_slug=post_slug, columns=columns)
 
         return get_paginated_response_context(
             pagination_class=PostPagination,
@@ -155,6 +293,7 @@ class CommentViewSet(ViewSet):
             queryset=queryset,
             request=request,
             view=self,
+            context=context,
         )
 
     def create(self, request, post_slug):
@@ -217,15 +356,72 @@ class LikeViewSet(ViewSet):
     permission_classes = [IsAuthenticated]
 
     def create(self, request, post_slug):
-        like = Like.objects.filter(like_post__slug=post_slug, like_user=request.user)
-        post = Post.objects.get(slug=post_slug)
+        if pending_likes.is_enabled():
+            states = buffer_like_toggles(user=request.user, slugs=[post_slug])
+            if not states:
+                return Response(
+                    {"detail": "Post not found."}, status=status.HTTP_404_NOT_FOUND
+                )
+            liked, likes = states[post_slug]
+        else:
+            try:
+                liked, likes = toggle_like(user=request.user, slug=post_slug)
+            except Post.DoesNotExist:
+                return Response(
+                    {"detail": "Post not found."}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        detail = "Like created." if liked else "Like deleted."
+        return Response({"detail": detail, "liked": liked, "likes": likes})
+
+
+class LikeBatchViewSet(ViewSet):
+    """
+    Likes of many posts at once, for feeds.
+
+    - `POST likes/toggle/` with `{"slugs": [...]}` toggles every post in one transaction.
+    - `GET likes/status/?slugs=a,b` tells which of the posts the user liked.
+
+    Both answer with the liked state and like count of each post, using the same number
+    of queries for one slug or fifty.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_batch_response(self, slugs, states):
+        return Response(
+            {
+                "results": [
+                    {"slug": slug, "liked": states[slug][0], "likes": states[slug][1]}
+                    for slug in slugs
+                    if slug in states
+                ],
+                "not_found": [slug for slug in slugs if slug not in states],
+            }
+        )
+
+    @action(detail=False, methods=["post"])
+    def toggle(self, request):
+        serializer = LikeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        slugs = serializer.validated_data["slugs"]
 
-        if like.exists():
-            like.delete()
-            return Response({"detail": "Like deleted."})
+        if pending_likes.is_enabled():
+            states = buffer_like_toggles(user=request.user, slugs=slugs)
         else:
-            Like.objects.create(like_user=request.user, like_post=post)
-            return Response({"detail": "Like created."})
+            states = toggle_likes(user=request.user, slugs=slugs)
+        return self.get_batch_response(slugs, states)
+
+    @action(detail=False, methods=["get"])
+    def status(self, request):
+        serializer = LikeBatchSerializer(
+            data={"slugs": request.query_params.get("slugs", "").split(",")}
+        )
+        serializer.is_valid(raise_exception=True)
+        slugs = serializer.validated_data["slugs"]
+
+        states = get_like_status(user=request.user, slugs=slugs)
+        return self.get_batch_response(slugs, states)
 
 
 class CategoryViewSet(ModelViewSet):
@@ -240,16 +436,15 @@ class FavoritePostViewSet(ViewSet):
     permission_classes = [IsAuthenticated]
 
     def create(self, request, *args, **kwargs):
-        slug = self.kwargs["post_slug"]
-        user = Profile.objects.get(user=request.user)
-        favorite_post = FavoritePost.objects.filter(post__slug=slug, user=user)
-        post = Post.objects.get(slug=slug)
-
-        if favorite_post.exists():
-            favorite_post.delete()
+        try:
+            favorited = toggle_favorite(
+                user=request.user, slug=self.kwargs["post_slug"]
+            )
+        except Post.DoesNotExist:
             return Response(
-                {"detail": "This post has been removed from your favorites."}
+                {"detail": "Post not found."}, status=status.HTTP_404_NOT_FOUND
             )
-        else:
-            FavoritePost.objects.create(post=post, user=user)
+
+        if favorited:
             return Response({"detail": "This post has been added to your favorites."})
+        return Response({"detail": "This post has been removed from your favorites."})
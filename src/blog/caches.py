@@ -0,0 +1,227 @@
+"""
+Response cache for the post list, invalidated by tags.
+
+Every cached page carries the tags it depends on together with the version each tag had
+when the page was built. A write bumps the versions of the tags it affects, and any
+page holding an older version becomes a miss. The version of a tag is the time of its
+last bump in nanoseconds, which also makes it a cheap "last changed" marker.
+
+- `posts:all`: unfiltered, search and date range listings. Any post write bumps it.
+- `author:<id>`: listings filtered by `author__in`. Renaming the author, or a category
+  they posted in, bumps it.
+- `category:<id>` and `categories`: listings filtered by `category__name`. Renaming any
+  author or creating a category bumps `categories`.
+- `post:<id>`: every page that shows the post. Likes and comments bump it.
+
+The post detail has no cache entry but uses the same versions for its ETag, see
+blog/api/v1/conditionals.py.
+
+With read replicas, a client reads from the primary for a while after it wrote, see
+core/db/routers.py. Those requests skip the cache, which may hold a page another client
+built from a replica that hasn't caught up. A page read from a replica isn't stored
+either while one of its tags was bumped in the last `REPLICA_STICKY_SECONDS`.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db.routers import is_using_primary
+from core.fieldsets import FIELDS_QUERY_PARAM
+
+TAG_KEY_PREFIX = "blog:tag:"
+POST_LIST_KEY_PREFIX = "blog:posts:list:"
+
+ALL_POSTS_TAG = "posts:all"
+CATEGORIES_TAG = "categories"
+
+
+def author_tag(user_id):
+    return f"author:{user_id}"
+
+
+def category_tag(category_id):
+    return f"category:{category_id}"
+
+
+def post_tag(post_id):
+    return f"post:{post_id}"
+
+
+def favorite_posts_cache_key(profile_id):
+    return f"profile_{profile_id}_favorite_ids"
+
+
+def get_tag_versions(tags):
+    """
+    Fetch the versions of `tags` in one round trip. A tag that was never bumped is 0.
+    """
+    keys = {f"{TAG_KEY_PREFIX}{tag}": tag for tag in tags}
+    versions = cache.get_many(list(keys))
+    return {tag: versions.get(key, 0) for key, tag in keys.items()}
+
+
+async def aget_tag_versions(tags):
+    keys = {f"{TAG_KEY_PREFIX}{tag}": tag for tag in tags}
+    versions = await cache.aget_many(list(keys))
+    return {tag: versions.get(key, 0) for key, tag in keys.items()}
+
+
+def bump_tags(*tags):
+    now = time.time_ns()
+    cache.set_many({f"{TAG_KEY_PREFIX}{tag}": now for tag in tags}, timeout=None)
+
+
+def invalidate_tags(*tags):
+    """
+    Bump `tags` once the current transaction commits, so a concurrent reader can't put
+    the old rows back in the cache under the new versions.
+    """
+    transaction.on_commit(lambda: bump_tags(*tags))
+
+
+def invalidate_post(post, *previous):
+    """
+    A post was created, changed or deleted. `previous` holds the state before an update,
+    because the post may have left its former author or category listing.
+    """
+    tags = {ALL_POSTS_TAG, post_tag(post.pk)}
+    for state in (post, *previous):
+        tags.add(author_tag(state.author_id))
+        if state.category_id is not None:
+            tags.add(category_tag(state.category_id))
+    invalidate_tags(*tags)
+
+
+def get_post_list_tags(filters):
+    """
+    The narrowest set of tags that covers every write able to change a listing with
+    these filters. A listing filtered by author only depends on those authors' posts.
+    """
+    User = get_user_model()
+
+    if filters.get("author__in"):
+        emails = set(filters["author__in"].split(","))
+        user_ids = list(
+            User.objects.filter(email__in=emails).values_list("id", flat=True)
+        )
+        # an unknown email may register and post later
+        if len(user_ids) == len(emails):
+            return [author_tag(user_id) for user_id in user_ids]
+        return [ALL_POSTS_TAG]
+
+    if filters.get("category__name"):
+        from blog.models import Category
+
+        category_ids = Category.objects.filter(
+            name__icontains=filters["category__name"]
+        ).values_list("id", flat=True)
+        return [CATEGORIES_TAG, *(category_tag(pk) for pk in category_ids)]
+
+    return [ALL_POSTS_TAG]
+
+
+def get_post_list_cache_key(request, filters, pagination_class):
+    """
+    The normalized filters, the position in the listing, the sparse fieldset and the
+    expansions. Scheme and host are part of the key because the payload holds absolute
+    urls.
+    """
+    signature = {
+        "url": request.build_absolute_uri(request.path),
+        "filters": sorted((name, str(value)) for name, value in filters.items()),
+        "pagination": pagination_class.__name__,
+        "page": request.query_params.get("page", ""),
+        "cursor": request.query_params.get("cursor", ""),
+        "fields": request.query_params.get(FIELDS_QUERY_PARAM, ""),
+        "expand": request.query_params.get("expand", ""),
+    }
+    digest = hashlib.sha1(json.dumps(signature, sort_keys=True).encode()).hexdigest()
+    return f"{POST_LIST_KEY_PREFIX}{digest}"
+
+
+def tag_version_to_timestamp(version):
+    return version // 1_000_000_000
+
+
+def get_cached_post_list(key):
+    """
+    Returns the cache entry, with its `data`, `tags` and `last_modified`, if none of its
+    tags were bumped since it was stored.
+    """
+    if is_using_primary():
+        return None
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    if get_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    return entry
+
+
+async def aget_cached_post_list(key):
+    if is_using_primary():
+        return None
+    entry = await cache.aget(key)
+    if entry is None:
+        return None
+
+    if await aget_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    return entry
+
+
+def can_cache_post_list(tags):
+    """
+    A page read from the primary holds writes the replicas may not have yet, a page read
+    from a replica may miss a write made in the last `REPLICA_STICKY_SECONDS`. Either
+    would be served to clients that must see those writes.
+    """
+    if not settings.REPLICA_DATABASES:
+        return True
+    if is_using_primary():
+        return False
+    caught_up = time.time_ns() - settings.REPLICA_STICKY_SECONDS * 1_000_000_000
+    return all(version < caught_up for version in tags.values())
+
+
+def cache_post_list(key, data, tag_versions, posts):
+    """
+    `tag_versions` must be read before the listing query runs. Otherwise a write that
+    lands in between would be cached under its own, already bumped, versions.
+    """
+    tags = {
+        **tag_versions,
+        **get_tag_versions(post_tag(post.id) for post in posts),
+    }
+    entry = make_post_list_entry(data, tags, posts)
+    if can_cache_post_list(tags):
+        cache.set(key, entry, timeout=settings.POST_LIST_CACHE_TIMEOUT)
+    return entry
+
+
+async def acache_post_list(key, data, tag_versions, posts):
+    tags = {
+        **tag_versions,
+        **await aget_tag_versions(post_tag(post.id) for post in posts),
+    }
+    entry = make_post_list_entry(data, tags, posts)
+    if can_cache_post_list(tags):
+        await cache.aset(key, entry, timeout=settings.POST_LIST_CACHE_TIMEOUT)
+    return entry
+
+
+def make_post_list_entry(data, tags, posts):
+    return {
+        "tags": tags,
+        "data": data,
+        "last_modified": max(
+            [int(post.updated_at.timestamp()) for post in posts]
+            + [tag_version_to_timestamp(version) for version in tags.values()]
+        ),
+    }
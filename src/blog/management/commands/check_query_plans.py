@@ -0,0 +1,209 @@
+import json
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Profile, User
+from blog.api.v1.paginations import PostCommentPagination, PostPagination
+from blog.models import Category, Comment, FavoritePost, Like, Post
+from blog.selectors import (
+    _post_detail_queryset,
+    get_comments,
+    get_post_comments,
+    get_posts,
+)
+
+
+def find_seq_scans(plan):
+    """
+    The relations read by a `Seq Scan` anywhere in an `EXPLAIN (FORMAT JSON)` plan,
+    subplans included.
+    """
+    if isinstance(plan, list):
+        plan = plan[0]
+    nodes = [plan.get("Plan", plan)]
+    relations = []
+
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            relations.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return relations
+
+
+def get_small_tables(min_rows):
+    """
+    Tables with fewer than `min_rows` rows according to the last ANALYZE.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class"
+            " WHERE relkind = 'r' AND reltuples >= 0 AND reltuples < %s",
+            [min_rows],
+        )
+        return {relname for (relname,) in cursor.fetchall()}
+
+
+def get_plan_queries():
+    """
+    The queries of the selectors and views on the hot paths, built for a sample post
+    and user, as they are sent to the database.
+    """
+    post = Post.objects.filter(status=True).order_by("-published_at", "-id").first()
+    like = Like.objects.order_by("pk").first()
+    favorite = FavoritePost.objects.order_by("pk").first()
+    if post is None or like is None or favorite is None:
+        raise CommandError("No data to explain, run with --seed.")
+
+    post_ids = list(
+        Post.objects.order_by("-pk").values_list("pk", flat=True)[
+            : PostPagination.page_size
+        ]
+    )
+    return {
+        "get_posts": get_posts().order_by("-published_at", "-id")[
+            : PostPagination.page_size
+        ],
+        "get_post": _post_detail_queryset().filter(slug=post.slug),
+        "get_post_comments": get_post_comments(post).order_by(
+            *PostCommentPagination.ordering
+        )[: PostCommentPagination.page_size + 1],
+        "get_comments": get_comments(post.slug)[: PostPagination.page_size],
+        "like_toggle": Like.objects.filter(
+            like_user_id=like.like_user_id, like_post_id=like.like_post_id
+        ),
+        "like_count": Like.objects.filter(like_post_id=like.like_post_id),
+        "like_status": Like.objects.filter(
+            like_user_id=like.like_user_id, like_post_id__in=post_ids
+        ),
+        "favorite_post": FavoritePost.objects.filter(
+            post__slug=favorite.post.slug, user_id=favorite.user_id
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot selector queries and fail on sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Number of posts to seed in a transaction that is rolled back at the end",
+        )
+        parser.add_argument(
+            "--allow-seqscan",
+            action="append",
+            default=[],
+            metavar="TABLE",
+            help="Table that may be read with a sequential scan, can be repeated",
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=1000,
+            help="Sequential scans of smaller tables are fine, they fit in a few pages",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"])
+
+            small_tables = set(options["allow_seqscan"]) | get_small_tables(
+                options["min_rows"]
+            )
+            failures = []
+            for name, queryset in get_plan_queries().items():
+                plan = queryset.explain(format="json")
+                seq_scans = [
+                    relation
+                    for relation in find_seq_scans(json.loads(plan))
+                    if relation not in small_tables
+                ]
+                if seq_scans:
+                    failures.append(name)
+                    self.stdout.write(
+                        self.style.ERROR(f"{name}: Seq Scan on {', '.join(seq_scans)}")
+                    )
+                else:
+                    self.stdout.write(f"{name}: OK")
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("No sequential scans."))
+
+    def seed(self, size):
+        """
+        A dataset large enough for the planner to prefer indexes where they apply.
+        """
+        run = random.getrandbits(32)
+        now = timezone.now()
+
+        users = User.objects.bulk_create(
+            User(email=f"plan-{run}-{i}@example.com", password="!")
+            for i in range(max(size // 10, 10))
+        )
+        profiles = Profile.objects.bulk_create(Profile(user=user) for user in users)
+        category, _ = Category.objects.get_or_create(name="Query plans")
+
+        posts = Post.objects.bulk_create(
+            (
+                Post(
+                    author=random.choice(users),
+                    category=category,
+                    title=f"Query plan {i}",
+                    slug=f"query-plan-{run}-{i}",
+                    content="content",
+                    image="image.jpg",
+                    status=i % 10 != 0,
+                    published_at=now - timedelta(minutes=i),
+                )
+                for i in range(size)
+            ),
+            batch_size=1000,
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    comment_user=random.choice(users),
+                    comment_post=post,
+                    comment="comment",
+                    created_at=now - timedelta(minutes=i),
+                )
+                for post in posts
+                for i in range(3)
+            ),
+            batch_size=1000,
+        )
+        Like.objects.bulk_create(
+            (
+                Like(like_user=user, like_post=post)
+                for user in users
+                for post in random.sample(posts, min(len(posts), 20))
+            ),
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        FavoritePost.objects.bulk_create(
+            (
+                FavoritePost(user=profile, post=post)
+                for profile in profiles
+                for post in random.sample(posts, min(len(posts), 5))
+            ),
+            batch_size=1000,
+        )
+
+        tables = [
+            model._meta.db_table
+            for model in (User, Profile, Category, Post, Comment, Like, FavoritePost)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(tables)}")
@@ -1,14 +1,81 @@
+import bisect
+import csv
+import io
 import random
-from datetime import datetime
+import secrets
+from datetime import timedelta
+from itertools import accumulate, islice
 
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
 from faker import Faker
 
 from accounts.models import Profile, User
-from blog.models import Category, Post
+from blog.models import (
+    Category,
+    Comment,
+    FavoritePost,
+    Like,
+    Post,
+    SlugCounter,
+    post_search_vector,
+)
+from blog.services import reconcile_like_counts
 
 category_list = ["Sport", "Technology", "Food", "Space", "Crypto"]
 
+# titles, contents and comments are drawn from this vocabulary: building text with
+# Faker costs more than inserting it, and a search term matches a known share of posts
+WORDS = (
+    "python django query index cache replica latency page cursor search rocket "
+    "planet coffee bread match goal token market chain orbit engine server "
+    "garden music travel winter summer river mountain city"
+).split()
+
+# minutes over which the posts are published, two years back from now
+PUBLISHED_SPAN = 2 * 365 * 24 * 60
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Load `rows` into `columns` of `table` with COPY, which skips parsing and planning
+    an INSERT per batch.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+
+
+class ZipfSampler:
+    """
+    Draws from `items` with Zipf distributed popularity: the item of rank k is drawn in
+    proportion to 1 / k ** exponent, 0 being uniform. Ranks are shuffled, so the
+    popular items are not the first ones inserted.
+    """
+
+    def __init__(self, items, exponent):
+        self.items = random.sample(items, len(items))
+        self.cum_weights = list(
+            accumulate(rank**-exponent for rank in range(1, len(items) + 1))
+        )
+        self.total = self.cum_weights[-1]
+
+    def __call__(self):
+        index = bisect.bisect(self.cum_weights, random.random() * self.total)
+        return self.items[min(index, len(self.items) - 1)]
+
 
 class Command(BaseCommand):
     help = "Inserting dummy data"
@@ -17,27 +84,217 @@ class Command(BaseCommand):
         super(Command, self).__init__(*args, **kwargs)
         self.fake = Faker()
 
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--posts", type=int, default=100)
+        parser.add_argument("--comments", type=int, default=300)
+        parser.add_argument(
+            "--likes",
+            type=int,
+            default=300,
+            help="Likes drawn, the repeated user and post pairs are dropped",
+        )
+        parser.add_argument(
+            "--favorites",
+            type=int,
+            default=50,
+            help="Favorites drawn, the repeated user and post pairs are dropped",
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Exponent of the popularity of posts and the activity of users,"
+            " 0 for uniform",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=5000, help="Rows per INSERT"
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Random seed, for a reproducible dataset"
+        )
+
     def handle(self, *args, **options):
-        user = User.objects.create_user(
-            email=self.fake.email(),
-            first_name=self.fake.first_name(),
-            last_name=self.fake.last_name(),
-            password="p@ssword",
-        )
-        profile = Profile.objects.get(user=user)
-        profile.bio = self.fake.paragraph(nb_sentences=5)
-        profile.birth_date = self.fake.date()
-        profile.save()
-
-        for category in category_list:
-            Category.objects.get_or_create(name=category)
-
-        for _ in range(10):
-            Post.objects.create(
-                author=user,
-                title=self.fake.paragraph(nb_sentences=1),
-                content=self.fake.paragraph(nb_sentences=10),
-                status=random.choice([True, False]),
-                category=Category.objects.get(name=random.choice(category_list)),
-                published_at=datetime.now(),
+        if options["users"] < 1:
+            raise CommandError("At least one user writes the posts.")
+        # drawn before seeding, so runs with the same --seed don't reuse the emails and
+        # slugs of the previous one
+        self.run = secrets.token_hex(4)
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+            self.fake.seed_instance(options["seed"])
+        self.chunk_size = options["chunk_size"]
+        self.now = timezone.now()
+
+        user_ids, profile_ids = self.create_users(options["users"])
+        self.log(f"{len(user_ids)} users")
+        if not options["posts"]:
+            return
+
+        exponent = options["zipf"]
+        authors = ZipfSampler(user_ids, exponent)
+        post_ids, published = self.create_posts(options["posts"], authors)
+        self.log(f"{len(post_ids)} posts")
+
+        popular_posts = ZipfSampler(post_ids, exponent)
+        active_users = ZipfSampler(user_ids, exponent)
+        self.create_comments(
+            options["comments"], popular_posts, active_users, published
+        )
+        self.log(f"{options['comments']} comments")
+
+        likes = self.create_pairs(
+            Like,
+            ["like_user_id", "like_post_id"],
+            options["likes"],
+            active_users,
+            popular_posts,
+        )
+        self.log(f"{likes} likes")
+
+        favorites = self.create_pairs(
+            FavoritePost,
+            ["user_id", "post_id"],
+            options["favorites"],
+            ZipfSampler(profile_ids, exponent),
+            popular_posts,
+        )
+        self.log(f"{favorites} favorites")
+
+        # the rows skipped the signals and the like counter
+        for chunk in chunked(post_ids, self.chunk_size):
+            reconcile_like_counts(chunk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE "
+                + ", ".join(
+                    model._meta.db_table
+                    for model in (User, Profile, Post, Comment, Like, FavoritePost)
+                )
+            )
+        self.stdout.write(self.style.SUCCESS("Like counts and statistics updated."))
+
+    def log(self, message):
+        self.stdout.write(f"Inserted {message}")
+
+    def create_users(self, count):
+        """
+        Users and their profiles, created together instead of by the post_save signal.
+        They all log in with p@ssword, hashed once.
+        """
+        password = make_password("p@ssword")
+        user_ids, profile_ids = [], []
+        for chunk in chunked(range(count), self.chunk_size):
+            users = User.objects.bulk_create(
+                User(
+                    email=f"user-{self.run}-{i}@example.com",
+                    first_name=self.fake.first_name(),
+                    last_name=self.fake.last_name(),
+                    password=password,
+                    is_verified=True,
+                )
+                for i in chunk
+            )
+            profiles = Profile.objects.bulk_create(
+                Profile(
+                    user=user,
+                    bio=" ".join(random.choices(WORDS, k=30)),
+                    birth_date=self.now.date()
+                    - timedelta(days=random.randrange(20000)),
+                )
+                for user in users
+            )
+            user_ids += [user.pk for user in users]
+            profile_ids += [profile.pk for profile in profiles]
+        return user_ids, profile_ids
+
+    def create_posts(self, count, authors):
+        """
+        Posts, 90% of them published over the last two years. Returns their ids and
+        {id: minutes between publication and now}.
+        """
+        categories = [
+            Category.objects.get_or_create(name=name)[0] for name in category_list
+        ]
+        post_ids, published = [], {}
+        for chunk in chunked(range(count), self.chunk_size):
+            ages = [random.randrange(PUBLISHED_SPAN) for _ in chunk]
+            posts = Post.objects.bulk_create(
+                Post(
+                    author_id=authors(),
+                    category=random.choice(categories),
+                    title=" ".join(random.choices(WORDS, k=6)).capitalize(),
+                    slug=f"post-{self.run}-{i}",
+                    content=" ".join(random.choices(WORDS, k=200)),
+                    status=random.random() < 0.9,
+                    published_at=self.now - timedelta(minutes=age),
+                )
+                for i, age in zip(chunk, ages)
+            )
+            ids = [post.pk for post in posts]
+            with connection.cursor() as cursor:
+                # so blog.services.allocate_slug doesn't hand them out again
+                copy_rows(
+                    cursor,
+                    SlugCounter._meta.db_table,
+                    ["base", "count"],
+                    ((post.slug, 1) for post in posts),
+                )
+            # created_at is set by auto_now_add, align it with the publication. The
+            # search vector is left to the post_save signal otherwise.
+            Post.objects.filter(pk__in=ids).update(
+                created_at=F("published_at"), search_vector=post_search_vector()
+            )
+            post_ids += ids
+            published.update(zip(ids, ages))
+        return post_ids, published
+
+    def create_comments(self, count, posts, users, published):
+        rows = (
+            (
+                users(),
+                post_id,
+                " ".join(random.choices(WORDS, k=15)),
+                # after the post was published
+                self.now - timedelta(minutes=random.randrange(published[post_id] + 1)),
+            )
+            for post_id in (posts() for _ in range(count))
+        )
+        with connection.cursor() as cursor:
+            for chunk in chunked(rows, self.chunk_size):
+                copy_rows(
+                    cursor,
+                    Comment._meta.db_table,
+                    ["comment_user_id", "comment_post_id", "comment", "created_at"],
+                    chunk,
+                )
+
+    def create_pairs(self, model, columns, count, users, posts):
+        """
+        `count` rows of `model` linking a user to a post, in `columns`, without the
+        pairs that already exist. They are copied to a temporary table first, then
+        inserted with ON CONFLICT DO NOTHING. Returns the number inserted.
+        """
+        rows = ((users(), posts()) for _ in range(count))
+        extra = {}
+        if model is Like:
+            extra["created_at"] = "now()"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE insert_data_pairs"
+                " (user_id bigint, post_id bigint)"
             )
+            try:
+                for chunk in chunked(rows, self.chunk_size):
+                    copy_rows(
+                        cursor, "insert_data_pairs", ["user_id", "post_id"], chunk
+                    )
+                cursor.execute(
+                    f"INSERT INTO {model._meta.db_table}"
+                    f" ({', '.join([*columns, *extra])})"
+                    f" SELECT {', '.join(['user_id', 'post_id', *extra.values()])}"
+                    " FROM insert_data_pairs ON CONFLICT DO NOTHING"
+                )
+                return cursor.rowcount
+            finally:
+                cursor.execute("DROP TABLE insert_data_pairs")
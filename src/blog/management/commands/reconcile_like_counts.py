@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.services import reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.like_count from the Like table in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of posts checked per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        checked = fixed = 0
+
+        while True:
+            post_ids = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not post_ids:
+                break
+
+            last_id = post_ids[-1]
+            checked += len(post_ids)
+            fixed += reconcile_like_counts(post_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} posts, fixed {fixed} like counts.")
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 4.1.5 on 2026-10-18 18:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_like_count(apps, schema_editor):
+    Like = apps.get_model("blog", "Like")
+    Post = apps.get_model("blog", "Post")
+
+    likes = (
+        Like.objects.filter(like_post=OuterRef("pk"))
+        .values("like_post")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Post.objects.update(like_count=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0015_alter_favoritepost_post_alter_favoritepost_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_like_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.5 on 2026-10-18 18:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the tables are live, build the indexes without blocking writes
+    atomic = False
+
+    dependencies = [
+        ("blog", "0017_post_search_vector"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(
+                fields=["comment_post", "created_at", "id"],
+                name="blog_comment_post_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="like",
+            index=models.Index(
+                fields=["like_post", "like_user"], name="blog_like_post_user_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "published_at"], name="blog_post_status_pub_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                models.OrderBy(models.F("published_at"), descending=True),
+                models.OrderBy(models.F("id"), descending=True),
+                condition=models.Q(("status", True)),
+                name="blog_post_published_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.1.5 on 2026-10-18 18:22
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def delete_duplicate_favorites(apps, schema_editor):
+    FavoritePost = apps.get_model("blog", "FavoritePost")
+
+    older = FavoritePost.objects.filter(
+        user=OuterRef("user"), post=OuterRef("post"), pk__lt=OuterRef("pk")
+    )
+    FavoritePost.objects.filter(Exists(older)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0018_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_favorites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="favoritepost",
+            constraint=models.UniqueConstraint(
+                fields=("user", "post"), name="blog_favorite_user_post_unique"
+            ),
+        ),
+    ]
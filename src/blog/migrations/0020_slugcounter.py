@@ -0,0 +1,45 @@
+# Generated by Django 4.1.5 on 2026-10-18 19:21
+
+from django.db import migrations, models
+
+
+def count_existing_slugs(apps, schema_editor):
+    """
+    The slugs taken before the counter, so they aren't handed out again.
+    """
+    Post = apps.get_model("blog", "Post")
+    SlugCounter = apps.get_model("blog", "SlugCounter")
+
+    counts = {}
+    for slug in Post.objects.exclude(slug="").values_list("slug", flat=True).iterator():
+        # as blog.services.split_slug, "hello--3" takes the first 3 of "hello"
+        base, separator, number = slug.rpartition("--")
+        if not (separator and number.isdigit()):
+            base, number = slug, 1
+        counts[base] = max(counts.get(base, 0), int(number))
+
+    SlugCounter.objects.bulk_create(
+        (SlugCounter(base=base, count=count) for base, count in counts.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0019_favoritepost_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlugCounter",
+            fields=[
+                (
+                    "base",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_slugs, migrations.RunPython.noop),
+    ]
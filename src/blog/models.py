@@ -1,10 +1,22 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 
 from accounts.models import Profile
+from blog.caches import (
+    ALL_POSTS_TAG,
+    CATEGORIES_TAG,
+    author_tag,
+    category_tag,
+    invalidate_tags,
+)
 
 
 class Category(models.Model):
@@ -32,9 +44,26 @@ class Post(models.Model):
     content = models.TextField()
     image = models.ImageField(default="cover-photo-3.PNG")
     status = models.BooleanField(default=False)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(default=timezone.now)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="blog_post_search_gin"),
+            models.Index(
+                fields=["status", "published_at"], name="blog_post_status_pub_idx"
+            ),
+            # the published listing, newest first, as get_posts pages through it
+            models.Index(
+                F("published_at").desc(),
+                F("id").desc(),
+                name="blog_post_published_idx",
+                condition=Q(status=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title}"
@@ -43,12 +72,40 @@ class Post(models.Model):
         return reverse("blog:blog-api-v1:posts-detail", kwargs={"slug": self.slug})
 
 
+class SlugCounter(models.Model):
+    """
+    Posts given each slug base so far, see `blog.services.allocate_slug`.
+    """
+
+    base = models.CharField(max_length=50, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.base} ({self.count})"
+
+
+def post_search_vector():
+    """
+    Title matches rank above content matches.
+    """
+    return SearchVector("title", weight="A", config="simple") + SearchVector(
+        "content", weight="B", config="simple"
+    )
+
+
 class FavoritePost(models.Model):
     user = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="favoritepost"
     )
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="blog_favorite_user_post_unique"
+            )
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.post}"
 
@@ -60,6 +117,12 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ["like_user", "like_post"]
+        # the unique pair leads with the user, counting the likes of a post needs this
+        indexes = [
+            models.Index(
+                fields=["like_post", "like_user"], name="blog_like_post_user_idx"
+            )
+        ]
 
     def __str__(self):
         return f"{self.like_user} - {self.like_post}"
@@ -73,5 +136,45 @@ class Comment(models.Model):
     comment = models.TextField(max_length=500)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["comment_post", "created_at", "id"],
+                name="blog_comment_post_created_idx",
+            )
+        ]
+
     def __str__(self):
         return f"{self.comment_user} - {self.comment_post}"
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"title", "content"} & set(update_fields):
+        return
+    Post.objects.filter(pk=instance.pk).update(search_vector=post_search_vector())
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def invalidate_category_listings(sender, instance, created=False, **kwargs):
+    """
+    Category names are rendered in every listing and matched by `category__name`. A new
+    category has no posts yet, but it may match the filter of a cached listing. On a
+    rename or delete, the listings of the authors who posted in it change too. It runs
+    before a delete, while the posts still point to the category.
+    """
+    if created:
+        invalidate_tags(CATEGORIES_TAG)
+        return
+
+    author_ids = (
+        Post.objects.filter(category=instance)
+        .values_list("author_id", flat=True)
+        .distinct()
+    )
+    invalidate_tags(
+        ALL_POSTS_TAG,
+        CATEGORIES_TAG,
+        category_tag(instance.pk),
+        *(author_tag(author_id) for author_id in author_ids),
+    )
@@ -0,0 +1,229 @@
+"""
+Write-behind buffer for likes, enabled with the `LIKES_WRITE_BEHIND` setting.
+
+A toggle only touches redis, so a burst of likes on one post doesn't queue on its row.
+`blog.tasks.flush_pending_likes` moves the buffer to the `Like` table every
+`LIKES_FLUSH_INTERVAL` seconds. Per post:
+
+- `blog:likes:<id>:pending`: hash of user id to the liked state (1 or 0) the user asked
+  for since the last flush.
+- `blog:likes:<id>:delta`: how much those pending states move `Post.like_count`.
+- `blog:likes:<id>:flushing` and `blog:likes:<id>:flushing_delta`: the same, for the
+  states a flush is writing. They are dropped once it committed.
+
+`blog:likes:dirty` holds the posts with pending states and `blog:likes:flushing` the
+posts being flushed, so a flush that died halfway is picked up again. Reads add both
+deltas to `like_count`, and a user's own pending state wins over the `Like` table.
+"""
+from django.conf import settings
+from django_redis import get_redis_connection
+
+KEY_PREFIX = "blog:likes:"
+DIRTY_KEY = f"{KEY_PREFIX}dirty"
+FLUSHING_KEY = f"{KEY_PREFIX}flushing"
+FLUSH_LOCK_KEY = f"{KEY_PREFIX}flush:lock"
+
+# KEYS: pending, flushing, delta, dirty. ARGV: user id, liked in the table, post id.
+TOGGLE_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], ARGV[1])
+if not state then
+    state = redis.call('HGET', KEYS[2], ARGV[1])
+end
+if not state then
+    state = ARGV[2]
+end
+local liked = 1 - tonumber(state)
+redis.call('HSET', KEYS[1], ARGV[1], liked)
+redis.call('INCRBY', KEYS[3], liked == 1 and 1 or -1)
+redis.call('SADD', KEYS[4], ARGV[3])
+return liked
+"""
+
+# KEYS: pending, flushing, delta, flushing_delta, flushing posts. ARGV: post id.
+# A flushing hash left by a failed flush is written again before new pending states.
+TAKE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 and redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    local delta = redis.call('GET', KEYS[3])
+    if delta then
+        redis.call('DEL', KEYS[3])
+        redis.call('INCRBY', KEYS[4], delta)
+    end
+end
+redis.call('SADD', KEYS[5], ARGV[1])
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# KEYS: pending, flushing, flushing_delta, flushing posts, dirty. ARGV: post id.
+FINISH_SCRIPT = """
+redis.call('DEL', KEYS[2], KEYS[3])
+redis.call('SREM', KEYS[4], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SADD', KEYS[5], ARGV[1])
+end
+"""
+
+
+def is_enabled():
+    return settings.LIKES_WRITE_BEHIND
+
+
+def get_connection():
+    return get_redis_connection("default")
+
+
+def pending_key(post_id):
+    return f"{KEY_PREFIX}{post_id}:pending"
+
+
+def flushing_key(post_id):
+    return f"{KEY_PREFIX}{post_id}:flushing"
+
+
+def delta_key(post_id):
+    return f"{KEY_PREFIX}{post_id}:delta"
+
+
+def flushing_delta_key(post_id):
+    return f"{KEY_PREFIX}{post_id}:flushing_delta"
+
+
+def get_pending_like_states(user_id, post_ids):
+    """
+    The liked state `user_id` is waiting for on each of `post_ids`, in one round trip.
+    Posts without a pending state are left out.
+    """
+    post_ids = list(post_ids)
+    pipe = get_connection().pipeline(transaction=False)
+    for post_id in post_ids:
+        pipe.hget(pending_key(post_id), user_id)
+        pipe.hget(flushing_key(post_id), user_id)
+    values = pipe.execute()
+
+    states = {}
+    for index, post_id in enumerate(post_ids):
+        pending, flushing = values[2 * index], values[2 * index + 1]
+        state = pending if pending is not None else flushing
+        if state is not None:
+            states[post_id] = state == b"1"
+    return states
+
+
+def get_pending_like_deltas(post_ids):
+    """
+    How much the buffered toggles move the like count of each of `post_ids`.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return {}
+
+    keys = []
+    for post_id in post_ids:
+        keys += [delta_key(post_id), flushing_delta_key(post_id)]
+    values = get_connection().mget(keys)
+    return {
+        post_id: int(values[2 * index] or 0) + int(values[2 * index + 1] or 0)
+        for index, post_id in enumerate(post_ids)
+    }
+
+
+def merge_pending_likes(posts):
+    """
+    Add the buffered toggles to the `like_count` of `posts`, a list of posts or selector
+    rows, in place. No-op unless the buffer is enabled, or for rows without `like_count`.
+    """
+    if not is_enabled() or not posts or not hasattr(posts[0], "like_count"):
+        return posts
+
+    deltas = get_pending_like_deltas(post.id for post in posts)
+    for index, post in enumerate(posts):
+        like_count = max(post.like_count + deltas[post.id], 0)
+        if isinstance(post, tuple):
+            # a selector row
+            posts[index] = post._replace(like_count=like_count)
+        else:
+            post.like_count = like_count
+    return posts
+
+
+def toggle_pending_likes(user_id, liked):
+    """
+    Buffer a toggle by `user_id` of every post in `liked`, {post_id: liked in the
+    table}. The table state is only used when the user has nothing pending on the post.
+    Returns {post_id: liked afterwards}.
+    """
+    connection = get_connection()
+    toggle = connection.register_script(TOGGLE_SCRIPT)
+    pipe = connection.pipeline(transaction=False)
+    for post_id, was_liked in liked.items():
+        toggle(
+            keys=[
+                pending_key(post_id),
+                flushing_key(post_id),
+                delta_key(post_id),
+                DIRTY_KEY,
+            ],
+            args=[user_id, int(was_liked), post_id],
+            client=pipe,
+        )
+    return {post_id: bool(state) for post_id, state in zip(liked, pipe.execute())}
+
+
+def take_pending_likes(batch_size):
+    """
+    Move the pending states of up to `batch_size` posts aside for a flush, posts a
+    failed flush left behind first. Returns {post_id: {user_id: liked}}.
+    """
+    connection = get_connection()
+    post_ids = list(connection.srandmember(FLUSHING_KEY, batch_size))
+    if len(post_ids) < batch_size:
+        post_ids += connection.spop(DIRTY_KEY, batch_size - len(post_ids)) or []
+
+    take = connection.register_script(TAKE_SCRIPT)
+    pipe = connection.pipeline(transaction=False)
+    for post_id in map(int, post_ids):
+        take(
+            keys=[
+                pending_key(post_id),
+                flushing_key(post_id),
+                delta_key(post_id),
+                flushing_delta_key(post_id),
+                FLUSHING_KEY,
+            ],
+            args=[post_id],
+            client=pipe,
+        )
+
+    changes = {}
+    for post_id, values in zip(map(int, post_ids), pipe.execute()):
+        changes[post_id] = {
+            int(user_id): state == b"1"
+            for user_id, state in zip(values[::2], values[1::2])
+        }
+    return changes
+
+
+def finish_pending_likes(post_ids):
+    """
+    Drop the states of a committed flush. Posts toggled meanwhile stay dirty.
+    """
+    connection = get_connection()
+    finish = connection.register_script(FINISH_SCRIPT)
+    pipe = connection.pipeline(transaction=False)
+    for post_id in post_ids:
+        finish(
+            keys=[
+                pending_key(post_id),
+                flushing_key(post_id),
+                flushing_delta_key(post_id),
+                FLUSHING_KEY,
+                DIRTY_KEY,
+            ],
+            args=[post_id],
+            client=pipe,
+        )
+    pipe.execute()
+
+
+def flush_lock(timeout):
+    return get_connection().lock(FLUSH_LOCK_KEY, timeout=timeout)
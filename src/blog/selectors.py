@@ -1,44 +1,331 @@
+from collections import namedtuple
+
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.core.cache import cache
+from django.contrib.postgres.search import SearchHeadline, SearchQuery
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from rest_framework.exceptions import NotFound
 
+from accounts.models import Profile
+from blog import pending_likes
 from blog.api.v1.filters import PostFilter
-from blog.models import Comment, Post
+from blog.caches import favorite_posts_cache_key
+from blog.models import Category, Comment, FavoritePost, Like, Post
+from core.fieldsets import project
 
 User = get_user_model()
 
 
-def get_posts(filters=None):
-    queryset = (
+def _post_list_queryset():
+    """
+    The list payload has no content and no comments, so neither is loaded. Only the
+    author and category columns rendered by `PostSerializer` are selected.
+    """
+    return (
         Post.objects.select_related("author", "category")
-        .prefetch_related("comments__comment_user")
-        .annotate(likes=Count("like__id"))
+        .only(
+            "id",
+            "author__first_name",
+            "author__last_name",
+            "category__name",
+            "title",
+            "slug",
+            "status",
+            "image",
+            "like_count",
+            "created_at",
+            "updated_at",
+            "published_at",
+        )
         .filter(status=True)
     )
+
+
+def _post_detail_queryset():
+    """
+    Comments are not prefetched, see `get_post_comments`.
+    """
+    return Post.objects.select_related("author", "category").filter(status=True)
+
+
+def get_posts(filters=None):
+    queryset = _post_list_queryset()
     filters = filters or {}
 
     return PostFilter(filters, queryset).qs
 
 
 def get_post(slug):
-    return (
-        Post.objects.select_related("author", "category")
-        .prefetch_related("comments__comment_user")
-        .annotate(likes=Count("like__id"))
-        .filter(status=True)
-        .get(slug=slug)
+    return _post_detail_queryset().get(slug=slug)
+
+
+POST_ROW_FIELDS = (
+    "id",
+    "author__first_name",
+    "author__last_name",
+    "category__name",
+    "title",
+    "slug",
+    "status",
+    "image",
+    "like_count",
+    "created_at",
+    "updated_at",
+    "published_at",
+)
+
+
+# every row has them whatever the projection: the post list cache entry and the cursor
+# are built from them
+POST_ROW_KEY_FIELDS = ("id", "updated_at", "published_at")
+
+
+def _post_row_columns(columns):
+    return list(dict.fromkeys((*POST_ROW_KEY_FIELDS, *columns)))
+
+
+def get_post_rows(filters=None, columns=POST_ROW_FIELDS):
+    """
+    `get_posts` as named rows with the columns `PostRowSerializer` renders. A narrower
+    `columns` also drops the joins to the author and category when they are not read.
+    """
+    return get_posts(filters).values_list(*_post_row_columns(columns), named=True)
+
+
+POST_DETAIL_ROW_FIELDS = (*POST_ROW_FIELDS, "content")
+
+
+def _post_row_queryset(columns):
+    return _post_detail_queryset().values_list(*_post_row_columns(columns), named=True)
+
+
+def get_post_row(slug, columns=POST_DETAIL_ROW_FIELDS):
+    return _post_row_queryset(columns).get(slug=slug)
+
+
+async def aget_post_row(slug, columns=POST_DETAIL_ROW_FIELDS):
+    return await _post_row_queryset(columns).aget(slug=slug)
+
+
+def _post_validators_queryset():
+    return Post.objects.filter(status=True).values(
+        "id", "author_id", "category_id", "like_count", "updated_at"
+    )
+
+
+def get_post_validators(slug):
+    """
+    The few columns the post detail ETag is derived from, without the post body.
+    """
+    return _post_validators_queryset().get(slug=slug)
+
+
+async def aget_post_validators(slug):
+    return await _post_validators_queryset().aget(slug=slug)
+
+
+def get_post_headlines(post_ids, search):
+    """
+    `ts_headline` is expensive, so it only runs for the posts of the current page.
+    """
+    query = SearchQuery(search, config="simple")
+    return dict(
+        Post.objects.filter(pk__in=post_ids)
+        .annotate(headline=SearchHeadline("content", query, config="simple"))
+        .values_list("pk", "headline")
+    )
+
+
+def get_post_comments(post):
+    """
+    Comments of the post detail, to be paginated in SQL. The post is already loaded,
+    so it is not joined again.
+    """
+    return Comment.objects.select_related("comment_user").filter(comment_post=post)
+
+
+def get_post_comment_rows(post_id):
+    """
+    `get_post_comments` as named rows for `CommentRowSerializer`.
+    """
+    return Comment.objects.filter(comment_post_id=post_id).values_list(
+        "id", "comment_user__email", "comment", "created_at", named=True
+    )
+
+
+LatestCommentRow = namedtuple(
+    "LatestCommentRow",
+    ["comment_post_id", "id", "comment_user__email", "comment", "created_at"],
+)
+
+
+def get_latest_comment_rows(post_ids, limit):
+    """
+    The `limit` newest comments of each of `post_ids`, newest first, as named rows for
+    `CommentRowSerializer`. One query for the whole page of posts: comments are numbered
+    per post with `row_number()` and the numbers past `limit` are filtered out.
+    """
+    if not post_ids:
+        return []
+
+    queryset = (
+        Comment.objects.filter(comment_post_id__in=post_ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("comment_post_id"),
+                order_by=[F("created_at").desc(), F("id").desc()],
+            )
+        )
+        .values_list(*LatestCommentRow._fields, "position")
     )
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        # Django 4.1 can't filter on a window function in the query that computes it
+        cursor.execute(
+            f"SELECT * FROM ({sql}) comments WHERE position <= %s"
+            " ORDER BY comment_post_id, position",
+            [*params, limit],
+        )
+        return [LatestCommentRow(*row[:-1]) for row in cursor.fetchall()]
 
 
-def get_comments(post_slug):
+def get_author_profiles(user_ids):
+    """
+    The profile of each author in `user_ids`, by user id, in one query.
+    """
+    return {
+        profile.user_id: profile
+        for profile in Profile.objects.filter(user_id__in=user_ids).values_list(
+            "user_id",
+            "user__first_name",
+            "user__last_name",
+            "image",
+            "bio",
+            named=True,
+        )
+    }
+
+
+def get_categories(category_ids):
+    """
+    {id: name} of the categories in `category_ids`, in one query.
+    """
+    return dict(Category.objects.filter(pk__in=category_ids).values_list("pk", "name"))
+
+
+def get_comments(post_slug, columns=None):
+    """
+    `columns` narrows the comments to the columns of the requested fields, see
+    `core.fieldsets`.
+    """
     if not Post.objects.filter(slug=post_slug).exists():
         raise NotFound({"detail": "Post not found."})
+    return _comments_queryset(post_slug, columns)
+
+
+async def aget_comments(post_slug, columns=None):
+    if not await Post.objects.filter(slug=post_slug).aexists():
+        raise NotFound({"detail": "Post not found."})
+    return _comments_queryset(post_slug, columns)
+
 
-    return Comment.objects.select_related(
+def _comments_queryset(post_slug, columns):
+    queryset = Comment.objects.filter(comment_post__slug=post_slug)
+    if columns is not None:
+        return project(queryset, columns)
+    return queryset.select_related(
         "comment_user",
         "comment_post",
-    ).filter(comment_post__slug=post_slug)
+    )
 
 
 def get_comment(pk):
     return Comment.objects.get(pk=pk)
+
+
+def get_like_status(user, slugs):
+    """
+    Whether `user` liked each post in `slugs` and its like count, in two queries
+    whatever the number of slugs. Returns {slug: (liked, like_count)}.
+    """
+    posts = {
+        post_id: (slug, like_count)
+        for post_id, slug, like_count in Post.objects.filter(
+            slug__in=slugs
+        ).values_list("pk", "slug", "like_count")
+    }
+    liked = set(
+        Like.objects.filter(like_user=user, like_post_id__in=posts).values_list(
+            "like_post_id", flat=True
+        )
+    )
+    if not pending_likes.is_enabled():
+        return {
+            slug: (post_id in liked, like_count)
+            for post_id, (slug, like_count) in posts.items()
+        }
+
+    pending = pending_likes.get_pending_like_states(user.id, posts)
+    deltas = pending_likes.get_pending_like_deltas(posts)
+    return {
+        slug: (
+            pending.get(post_id, post_id in liked),
+            max(like_count + deltas[post_id], 0),
+        )
+        for post_id, (slug, like_count) in posts.items()
+    }
+
+
+FAVORITE_IDS_TIMEOUT = 300
+
+
+def _favorite_ids_queryset(profile):
+    return (
+        FavoritePost.objects.filter(user=profile)
+        .order_by("-id")
+        .values_list("id", flat=True)
+    )
+
+
+def get_favorite_ids(profile):
+    """
+    Ids of the favorites of the profile, newest first. Only the ids are cached, the
+    favorites of a page are loaded by `get_favorite_posts`.
+    """
+    key = favorite_posts_cache_key(profile.id)
+    favorite_ids = cache.get(key)
+    if favorite_ids is None:
+        favorite_ids = list(_favorite_ids_queryset(profile))
+        cache.set(key, favorite_ids, timeout=FAVORITE_IDS_TIMEOUT)
+    return favorite_ids
+
+
+async def aget_favorite_ids(profile):
+    key = favorite_posts_cache_key(profile.id)
+    favorite_ids = await cache.aget(key)
+    if favorite_ids is None:
+        favorite_ids = [pk async for pk in _favorite_ids_queryset(profile)]
+        await cache.aset(key, favorite_ids, timeout=FAVORITE_IDS_TIMEOUT)
+    return favorite_ids
+
+
+def _favorite_posts_queryset():
+    return FavoritePost.objects.select_related("post__author", "post__category")
+
+
+def get_favorite_posts(favorite_ids):
+    """
+    The favorites of one page in the order of `favorite_ids`, with what
+    `FavoritePostSerializer` renders. Favorites removed since the ids were cached are
+    skipped.
+    """
+    favorites = _favorite_posts_queryset().in_bulk(favorite_ids)
+    return [favorites[pk] for pk in favorite_ids if pk in favorites]
+
+
+async def aget_favorite_posts(favorite_ids):
+    favorites = await _favorite_posts_queryset().ain_bulk(favorite_ids)
+    return [favorites[pk] for pk in favorite_ids if pk in favorites]
@@ -1,28 +1,108 @@
+from copy import copy
+
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from django.utils.text import slugify
 
-from blog.models import Comment, Post
+from accounts.models import Profile
+from blog import pending_likes
+from blog.caches import (
+    bump_tags,
+    favorite_posts_cache_key,
+    invalidate_post,
+    invalidate_tags,
+    post_tag,
+)
+from blog.models import Comment, Like, Post
 
 User = get_user_model()
 
 
+# slugify never returns two dashes in a row, so "<base>--<n>" can't be the slug of
+# another title, and a slug set by hand in that form is counted under its base, see
+# reserve_slug. The base leaves room for the suffix in the 50 characters of the slug.
+SLUG_BASE_LENGTH = 40
+
+ALLOCATE_SLUG_SQL = """
+INSERT INTO blog_slugcounter (base, count) VALUES (%(base)s, 1)
+ON CONFLICT (base) DO UPDATE SET count = blog_slugcounter.count + 1
+RETURNING count
+"""
+
+RESERVE_SLUG_SQL = """
+INSERT INTO blog_slugcounter (base, count) VALUES (%(base)s, %(count)s)
+ON CONFLICT (base) DO UPDATE
+SET count = GREATEST(blog_slugcounter.count, EXCLUDED.count)
+"""
+
+
+def get_slug_base(title):
+    return slugify(title)[:SLUG_BASE_LENGTH].strip("-_") or "post"
+
+
+def split_slug(slug):
+    """
+    The base and number of a slug `allocate_slug` could hand out, ("hello", 2) for
+    "hello--2" and ("hello", 1) for "hello".
+    """
+    base, separator, number = slug.rpartition("--")
+    if separator and number.isdigit():
+        return base, int(number)
+    return slug, 1
+
+
+def allocate_slug(title):
+    """
+    A slug for a post titled `title` that no other post has, in a single statement:
+    the slug of the title the first time, then the slug with a "--2", "--3", ...
+    suffix. Long titles are cut to fit, titles without a letter or digit get "post".
+
+    The counter row stays locked until the transaction ends, so concurrent posts with
+    the same title get one number each, and a rolled back post gives its number back.
+    """
+    base = get_slug_base(title)
+    with connection.cursor() as cursor:
+        cursor.execute(ALLOCATE_SLUG_SQL, {"base": base})
+        (count,) = cursor.fetchone()
+    return base if count == 1 else f"{base}--{count}"
+
+
+def reserve_slug(slug):
+    """
+    Count a slug chosen by hand, so `allocate_slug` doesn't hand it out again. A slug
+    with a "--<n>" suffix moves the counter of its base to at least n, so the next one
+    allocated is n + 1.
+    """
+    base, count = split_slug(slug)
+    with connection.cursor() as cursor:
+        cursor.execute(RESERVE_SLUG_SQL, {"base": base, "count": count})
+
+
 @transaction.atomic
 def create_post(user, category, title, content, image, status, published_at):
-    return Post.objects.create(
+    post = Post.objects.create(
         author=user,
         category=category,
         title=title,
-        slug=slugify(title),
+        slug=allocate_slug(title),
         content=content,
         image=image,
         status=status,
         published_at=published_at,
     )
+    invalidate_post(post)
+    return post
 
 
+@transaction.atomic
 def delete_post(slug):
-    return Post.objects.get(slug=slug).delete()
+    post = Post.objects.get(slug=slug)
+    invalidate_post(post)
+    return post.delete()
 
 
 # post.category = validated_data["category"]
@@ -37,15 +117,20 @@ def delete_post(slug):
 @transaction.atomic
 def update_post(validated_data, author, slug):
     post = Post.objects.get(slug=slug)
+    previous = copy(post)
     post.author = author
 
     if "category" in validated_data:
         post.category = validated_data["category"]
-    if "title" in validated_data:
+    if "title" in validated_data and validated_data["title"] != post.title:
         post.title = validated_data["title"]
+        # a title that gives the same slug, e.g. with punctuation added, keeps it
+        if split_slug(post.slug)[0] != get_slug_base(post.title):
+            post.slug = allocate_slug(post.title)
 
     if "slug" in validated_data:
         post.slug = validated_data["slug"]
+        reserve_slug(post.slug)
     if "content" in validated_data:
         post.content = validated_data["content"]
     if "image" in validated_data:
@@ -57,21 +142,292 @@ def update_post(validated_data, author, slug):
 
     post.full_clean()
     post.save()
+    invalidate_post(post, previous)
     return post
 
 
+@transaction.atomic
 def create_comment(user, post, comment):
+    invalidate_tags(post_tag(post.pk))
     return Comment.objects.create(comment_user=user, comment_post=post, comment=comment)
 
 
+@transaction.atomic
 def update_comment(comment, pk):
     get_comment = Comment.objects.get(pk=pk)
     get_comment.comment = comment
 
     get_comment.full_clean()
     get_comment.save()
+    invalidate_tags(post_tag(get_comment.comment_post_id))
     return get_comment
 
 
+@transaction.atomic
 def delete_comment(pk):
-    return Comment.objects.get(pk=pk).delete()
+    comment = Comment.objects.get(pk=pk)
+    invalidate_tags(post_tag(comment.comment_post_id))
+    return comment.delete()
+
+
+# The toggles of a user take this lock first, so two of them never insert and delete
+# the user's likes in opposite orders and deadlock.
+USER_LIKES_LOCK = (
+    "SELECT pg_advisory_xact_lock("
+    "hashtext('blog_like'), (%(user_id)s %% 2147483647)::int)"
+)
+
+TOGGLE_LIKE_SQL = f"""
+WITH user_lock AS ({USER_LIKES_LOCK}), post AS (
+    SELECT id FROM blog_post, user_lock WHERE slug = %(slug)s
+), removed AS (
+    DELETE FROM blog_like USING post
+    WHERE blog_like.like_post_id = post.id AND blog_like.like_user_id = %(user_id)s
+    RETURNING blog_like.id
+), added AS (
+    INSERT INTO blog_like (like_user_id, like_post_id, created_at)
+    SELECT %(user_id)s, post.id, %(now)s FROM post
+    WHERE NOT EXISTS (SELECT FROM removed)
+    ON CONFLICT (like_user_id, like_post_id) DO NOTHING
+    RETURNING id
+)
+UPDATE blog_post
+SET like_count = GREATEST(
+    like_count + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed), 0
+)
+FROM post
+WHERE blog_post.id = post.id
+RETURNING blog_post.id, NOT EXISTS (SELECT FROM removed), blog_post.like_count
+"""
+
+
+def toggle_like(user, slug):
+    """
+    Like the post for `user`, or remove the like if it exists, and move
+    `Post.like_count`, in a single statement. Returns whether the post is liked
+    afterwards and its like count.
+
+    Two concurrent likes by the same user don't fail on the unique pair, the second one
+    finds the row of the first and leaves the post liked.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TOGGLE_LIKE_SQL, {"slug": slug, "user_id": user.pk, "now": timezone.now()}
+        )
+        row = cursor.fetchone()
+    if row is None:
+        raise Post.DoesNotExist
+
+    post_id, liked, like_count = row
+    invalidate_tags(post_tag(post_id))
+    return liked, like_count
+
+
+TOGGLE_LIKES_SQL = f"""
+WITH user_lock AS ({USER_LIKES_LOCK}), post AS (
+    SELECT id, slug FROM blog_post, user_lock WHERE slug = ANY(%(slugs)s)
+), removed AS (
+    DELETE FROM blog_like USING post
+    WHERE blog_like.like_post_id = post.id AND blog_like.like_user_id = %(user_id)s
+    RETURNING blog_like.like_post_id
+), added AS (
+    INSERT INTO blog_like (like_user_id, like_post_id, created_at)
+    SELECT %(user_id)s, post.id, %(now)s FROM post
+    WHERE post.id NOT IN (SELECT like_post_id FROM removed)
+    ORDER BY post.id
+    ON CONFLICT (like_user_id, like_post_id) DO NOTHING
+    RETURNING like_post_id
+)
+SELECT
+    post.id,
+    post.slug,
+    post.id IN (SELECT like_post_id FROM added),
+    post.id IN (SELECT like_post_id FROM removed)
+FROM post
+"""
+
+
+@transaction.atomic
+def toggle_likes(user, slugs):
+    """
+    Toggle the likes of `user` on the posts in `slugs` with a fixed number of queries.
+    Returns {slug: (liked, like_count)}.
+
+    Like `toggle_like`, the likes are written first and `like_count` only moves by the
+    rows the statement actually inserted or deleted, so a like added meanwhile by
+    another request isn't counted twice. The posts are then locked in id order, after
+    the likes as the single toggle does, so the two never wait on each other.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TOGGLE_LIKES_SQL,
+            {"slugs": list(slugs), "user_id": user.pk, "now": timezone.now()},
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return {}
+
+    posts = {post_id: slug for post_id, slug, _, _ in rows}
+    added = [post_id for post_id, _, was_added, _ in rows if was_added]
+    removed = [post_id for post_id, _, _, was_removed in rows if was_removed]
+
+    if added or removed:
+        list(
+            Post.objects.select_for_update()
+            .filter(pk__in=added + removed)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+    if removed:
+        Post.objects.filter(pk__in=removed).update(
+            like_count=Greatest(F("like_count") - 1, 0)
+        )
+    if added:
+        Post.objects.filter(pk__in=added).update(like_count=F("like_count") + 1)
+
+    invalidate_tags(*(post_tag(post_id) for post_id in posts))
+
+    like_counts = Post.objects.filter(pk__in=posts).values_list("pk", "like_count")
+    # a post neither added nor removed was liked by a concurrent request
+    return {
+        posts[post_id]: (post_id not in removed, like_count)
+        for post_id, like_count in like_counts
+    }
+
+
+def buffer_like_toggles(user, slugs):
+    """
+    Write-behind counterpart of `toggle_likes`: the toggles go to redis and the `Like`
+    table is only read, for the posts the user has nothing pending on. Returns
+    {slug: (liked, like_count)}.
+    """
+    posts = {
+        post_id: (slug, like_count)
+        for post_id, slug, like_count in Post.objects.filter(
+            slug__in=slugs
+        ).values_list("pk", "slug", "like_count")
+    }
+    if not posts:
+        return {}
+
+    liked = pending_likes.get_pending_like_states(user.id, posts)
+    unknown = [post_id for post_id in posts if post_id not in liked]
+    if unknown:
+        in_table = set(
+            Like.objects.filter(like_user=user, like_post_id__in=unknown).values_list(
+                "like_post_id", flat=True
+            )
+        )
+        liked.update({post_id: post_id in in_table for post_id in unknown})
+
+    liked = pending_likes.toggle_pending_likes(user.id, liked)
+    bump_tags(*(post_tag(post_id) for post_id in posts))
+
+    deltas = pending_likes.get_pending_like_deltas(posts)
+    return {
+        slug: (liked[post_id], max(like_count + deltas[post_id], 0))
+        for post_id, (slug, like_count) in posts.items()
+    }
+
+
+@transaction.atomic
+def apply_like_changes(changes):
+    """
+    Write the toggles of a write-behind flush, {post_id: {user_id: liked}}, and recount
+    `like_count` of the posts. Users and posts deleted since the toggle are skipped.
+    """
+    user_ids = {user_id for states in changes.values() for user_id in states}
+    user_ids = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+    post_ids = set(Post.objects.filter(pk__in=changes).values_list("pk", flat=True))
+
+    likes = []
+    unliked = Q()
+    for post_id, states in changes.items():
+        if post_id not in post_ids:
+            continue
+        likes += [
+            Like(like_user_id=user_id, like_post_id=post_id)
+            for user_id, liked in states.items()
+            if liked and user_id in user_ids
+        ]
+        removed = [user_id for user_id, liked in states.items() if not liked]
+        if removed:
+            unliked |= Q(like_post_id=post_id, like_user_id__in=removed)
+
+    if unliked:
+        Like.objects.filter(unliked).delete()
+    Like.objects.bulk_create(likes, batch_size=1000, ignore_conflicts=True)
+    reconcile_like_counts(post_ids)
+    return len(likes)
+
+
+@transaction.atomic
+def reconcile_like_counts(post_ids):
+    """
+    Reset `like_count` from the `Like` table for the given posts, only touching the rows
+    that drifted. Returns the number of fixed posts.
+    """
+    likes = (
+        Like.objects.filter(like_post=OuterRef("pk"))
+        .values("like_post")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    drifted = list(
+        Post.objects.filter(pk__in=post_ids)
+        .annotate(actual=Coalesce(Subquery(likes), 0))
+        .exclude(like_count=F("actual"))
+        .values_list("pk", flat=True)
+    )
+    if drifted:
+        Post.objects.filter(pk__in=drifted).update(
+            like_count=Coalesce(Subquery(likes), 0)
+        )
+    return len(drifted)
+
+
+TOGGLE_FAVORITE_SQL = """
+WITH target AS (
+    SELECT accounts_profile.id AS profile_id, blog_post.id AS post_id
+    FROM accounts_profile, blog_post
+    WHERE accounts_profile.user_id = %(user_id)s AND blog_post.slug = %(slug)s
+), removed AS (
+    DELETE FROM blog_favoritepost USING target
+    WHERE blog_favoritepost.user_id = target.profile_id
+        AND blog_favoritepost.post_id = target.post_id
+    RETURNING blog_favoritepost.id
+), added AS (
+    INSERT INTO blog_favoritepost (user_id, post_id)
+    SELECT profile_id, post_id FROM target
+    WHERE NOT EXISTS (SELECT FROM removed)
+    ON CONFLICT (user_id, post_id) DO NOTHING
+)
+SELECT profile_id, NOT EXISTS (SELECT FROM removed) FROM target
+"""
+
+
+def _execute_toggle_favorite(user, slug):
+    with connection.cursor() as cursor:
+        cursor.execute(TOGGLE_FAVORITE_SQL, {"slug": slug, "user_id": user.pk})
+        return cursor.fetchone()
+
+
+def toggle_favorite(user, slug):
+    """
+    Add the post to the favorites of `user`'s profile, or remove it if it is there, in
+    a single statement. Returns True if the post is a favorite afterwards.
+
+    A user without a profile gets one created before the toggle is retried, so
+    `Post.DoesNotExist` is only raised when the post is missing.
+    """
+    row = _execute_toggle_favorite(user, slug)
+    if row is None:
+        _, created = Profile.objects.get_or_create(user=user)
+        if created:
+            row = _execute_toggle_favorite(user, slug)
+    if row is None:
+        raise Post.DoesNotExist
+
+    profile_id, favorited = row
+    transaction.on_commit(lambda: cache.delete(favorite_posts_cache_key(profile_id)))
+    return favorited
@@ -0,0 +1,67 @@
+import time
+
+from celery import shared_task
+
+from blog import pending_likes
+from blog.caches import bump_tags, post_tag
+from blog.models import Post, post_search_vector
+from blog.services import apply_like_changes
+
+
+@shared_task
+def reindex_post_search_vectors(batch_size=1000):
+    """
+    Rebuild `Post.search_vector` for every post, one short UPDATE per batch of ids.
+    """
+    last_id = 0
+    reindexed = 0
+
+    while True:
+        post_ids = list(
+            Post.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not post_ids:
+            break
+
+        last_id = post_ids[-1]
+        reindexed += Post.objects.filter(pk__in=post_ids).update(
+            search_vector=post_search_vector()
+        )
+
+    return reindexed
+
+
+FLUSH_LOCK_TIMEOUT = 300
+
+
+@shared_task
+def flush_pending_likes(batch_size=500, max_seconds=FLUSH_LOCK_TIMEOUT / 2):
+    """
+    Write the likes buffered in redis to the `Like` table, one transaction per batch of
+    posts. Only one flush runs at a time, an overlapping run returns right away.
+
+    Under a steady stream of toggles there is always another batch, so a flush stops
+    taking batches after `max_seconds` and leaves the rest to the next run. The lock is
+    extended after each batch, so it can't expire under a slow one.
+    """
+    lock = pending_likes.flush_lock(timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return 0
+
+    deadline = time.monotonic() + max_seconds
+    flushed = 0
+    try:
+        while time.monotonic() < deadline and (
+            changes := pending_likes.take_pending_likes(batch_size)
+        ):
+            apply_like_changes(changes)
+            pending_likes.finish_pending_likes(changes)
+            # pages cached between the commit and the finish counted the toggles twice
+            bump_tags(*(post_tag(post_id) for post_id in changes))
+            flushed += len(changes)
+            lock.reacquire()
+    finally:
+        lock.release()
+    return flushed
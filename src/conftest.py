@@ -3,6 +3,7 @@ import shutil
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from pytest_factoryboy import register
 from rest_framework.test import APIClient
 
@@ -62,3 +63,13 @@ def create_author(db, user_factory):
 @pytest.fixture()
 def create_comment(db, comment_factory, create_post, create_user):
     return comment_factory.create(comment_user=create_user, comment_post=create_post)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    The post list and profile caches live in redis, a page cached by one test must not
+    be served in another.
+    """
+    cache.clear()
+    yield
@@ -0,0 +1,49 @@
+"""
+Base view of the async read endpoints, served under /api/v1/async/ by an ASGI server.
+
+DRF 3.14 only dispatches to sync handlers. `AsyncAPIView` keeps DRF's request, content
+negotiation, renderers and exception handling, which don't block, and awaits the
+handler. Authentication and permissions may query the database, so they run in a
+thread with `sync_to_async`.
+"""
+from asgiref.sync import sync_to_async
+from django.http.response import HttpResponseBase
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    An `APIView` whose handlers are coroutines. Read only: the browsable API renders
+    forms that need the sync ORM, so it is not offered.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    renderer_classes = [
+        renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(renderer, BrowsableAPIRenderer)
+    ]
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if not isinstance(response, HttpResponseBase):
+                # options is APIView's own, sync handler
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
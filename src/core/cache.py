@@ -0,0 +1,29 @@
+"""
+The redis cache backend, counting the hits, misses and time of each lookup for
+`core.metrics`.
+"""
+import time
+
+from django_redis.cache import RedisCache
+
+from core import metrics
+
+_missing = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    def get(self, key, default=None, version=None, client=None):
+        start = time.perf_counter()
+        value = super().get(key, _missing, version=version, client=client)
+        hit = value is not _missing
+        metrics.record_cache(int(hit), int(not hit), time.perf_counter() - start)
+        return value if hit else default
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        start = time.perf_counter()
+        values = super().get_many(keys, version=version, client=client)
+        metrics.record_cache(
+            len(values), len(keys) - len(values), time.perf_counter() - start
+        )
+        return values
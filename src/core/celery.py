@@ -20,9 +20,18 @@ app.config_from_object(settings, namespace="CELERY")
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
-app.conf.beat_schedule = {
-    "delete_unverified_users": {
-        "task": "accounts.tasks.delete_unverified_users",
-        "schedule": crontab(day_of_week="*", hour=0, minute=0),
-    },
-}
+
+@app.on_after_configure.connect
+def set_beat_schedule(sender, **kwargs):
+    # set once the app is configured, so importing this module doesn't load the
+    # settings LIKES_FLUSH_INTERVAL comes from
+    sender.conf.beat_schedule = {
+        "delete_unverified_users": {
+            "task": "accounts.tasks.delete_unverified_users",
+            "schedule": crontab(day_of_week="*", hour=0, minute=0),
+        },
+        "flush_pending_likes": {
+            "task": "blog.tasks.flush_pending_likes",
+            "schedule": settings.LIKES_FLUSH_INTERVAL,
+        },
+    }
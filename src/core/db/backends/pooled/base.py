@@ -0,0 +1,49 @@
+"""
+The postgresql backend, with connections checked out of a `core.db.pool` pool and
+returned to it on close instead of being closed.
+"""
+from functools import partial
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import (
+    DatabaseCreation as BaseDatabaseCreation,
+)
+from django.utils.asyncio import async_unsafe
+
+from core.db.pool import close_pool, get_pool
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # the idle connections of the pool would block the drop
+        close_pool(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            self.alias,
+            self.settings_dict["OPTIONS"].get("pool", {}),
+            partial(super().get_new_connection, conn_params),
+            health_checks=self.settings_dict["CONN_HEALTH_CHECKS"],
+        )
+        connection = self.pool.getconn()
+        # set by the postgresql backend when it opens the connection
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
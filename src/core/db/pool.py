@@ -0,0 +1,210 @@
+"""
+In-process pool of Postgres connections, used by the `core.db.backends.pooled` engine.
+
+Django closes the connection of a request when it finishes, unless CONN_MAX_AGE keeps it
+on its thread. Under ASGI a request's sync code runs on whichever thread is free, so
+connections kept per thread pile up. The pooled engine instead hands each request a
+connection from a pool of at most `max_size`, shared by the threads of the process, and
+takes it back when Django closes it.
+
+Options, in `DATABASES[alias]["OPTIONS"]["pool"]`:
+
+- `max_size`: connections the process may open.
+- `timeout`: seconds a checkout waits for a free connection before it fails.
+- `max_idle`: seconds an idle connection is kept open.
+
+Checked out connections are tested with `SELECT 1` first when CONN_HEALTH_CHECKS is on.
+Each process has its own pools, so a forked worker never shares its parent's sockets.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import Error, OperationalError, extensions
+
+DEFAULT_OPTIONS = {"max_size": 10, "timeout": 10, "max_idle": 300}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size, timeout, max_idle, health_checks=False):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_checks = health_checks
+        self.pid = os.getpid()
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # (connection, returned at), the most recently returned last
+        self._idle = deque()
+        self.size = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def getconn(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise OperationalError(
+                    f"No free connection in the pool after {self.timeout}s,"
+                    f" all {self.max_size} are in use."
+                )
+
+        try:
+            connection = self._get_idle()
+            if connection is None:
+                connection = self.connect()
+                with self._lock:
+                    self.size += 1
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+        return connection
+
+    def putconn(self, connection):
+        with self._lock:
+            self.in_use -= 1
+        try:
+            if self._reset(connection):
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+            self._close_stale()
+        finally:
+            self._slots.release()
+
+    def _get_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, _ = self._idle.pop()
+            if self._is_usable(connection):
+                return connection
+            self._discard(connection)
+
+    def _is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Error:
+            return False
+        return True
+
+    def _reset(self, connection):
+        """
+        Roll back what the connection left open and put it back in autocommit, as
+        Django opens it. False if it can't be reused.
+        """
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            connection.autocommit = True
+        except Error:
+            return False
+        return True
+
+    def _close_stale(self):
+        stale_before = time.monotonic() - self.max_idle
+        while True:
+            with self._lock:
+                if not self._idle or self._idle[0][1] > stale_before:
+                    return
+                connection, _ = self._idle.popleft()
+            self._discard(connection)
+
+    def _discard(self, connection):
+        with self._lock:
+            self.size -= 1
+            self.discarded += 1
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def close(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return
+                connection, _ = self._idle.popleft()
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "discarded": self.discarded,
+            }
+
+
+def get_pool(alias, options, connect, health_checks=False):
+    """
+    The pool of the database `alias` in this process, created on first use with
+    `connect` opening its connections.
+    """
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[alias] = ConnectionPool(
+                connect, health_checks=health_checks, **{**DEFAULT_OPTIONS, **options}
+            )
+        return pool
+
+
+def close_pool(alias):
+    with _pools_lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+def get_database_stats(connections):
+    """
+    How each database of `connections` reuses its connections, with the usage of its
+    pool in this process if it has one.
+    """
+    stats = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        pool = _pools.get(alias)
+        stats[alias] = {
+            "engine": settings_dict["ENGINE"],
+            "conn_max_age": settings_dict["CONN_MAX_AGE"],
+            "conn_health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+            "pool": (
+                pool.stats() if pool is not None and pool.pid == os.getpid() else None
+            ),
+        }
+    return {"pid": os.getpid(), "databases": stats}
@@ -0,0 +1,62 @@
+"""
+Reads go to a replica of `REPLICA_DATABASES`, writes to the primary, `default`.
+
+Reads also go to the primary:
+
+- inside a transaction on the primary, so a service reads what it is writing, and reads
+  rows it locks with select_for_update there;
+- while `use_primary()` is active. `core.middleware.primary_replica_middleware`
+  activates it for requests that write and for the requests a client makes in the
+  `REPLICA_STICKY_SECONDS` after a write, so the client reads its own writes while the
+  replicas catch up.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_primary = ContextVar("use_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def is_using_primary():
+    """
+    Whether this request reads from the primary to see its own writes.
+    """
+    return _use_primary.get()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if (
+            not replicas
+            or _use_primary.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db == DEFAULT_DB_ALIAS:
+            # the relations of a row read from the primary
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,82 @@
+"""
+Sparse fieldsets: `?fields=id,title` renders only those fields of the payload.
+
+The serializers also tell which model columns the requested fields are rendered from,
+so the selectors can load just those columns and skip the joins nobody asked for.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_requested_fields(request):
+    """
+    The field names of `?fields=`, or None when the parameter is absent, which means all
+    the fields.
+    """
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if value is None:
+        return None
+
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    if not fields:
+        raise ValidationError({FIELDS_QUERY_PARAM: "Name at least one field."})
+    return fields
+
+
+def select_fields(fields, requested):
+    """
+    The items of `fields`, a mapping keyed by field name, that are in `requested`, in
+    the order of `fields`. None keeps them all.
+    """
+    if requested is None:
+        return fields
+
+    unknown = [name for name in requested if name not in fields]
+    if unknown:
+        raise ValidationError(
+            {
+                FIELDS_QUERY_PARAM: f"Unknown fields: {', '.join(unknown)}."
+                f" Choose from {', '.join(fields)}."
+            }
+        )
+    return {name: field for name, field in fields.items() if name in requested}
+
+
+def get_columns(fields, field_columns):
+    """
+    The model columns `fields` are rendered from. A field missing from `field_columns`
+    is the column of the same name.
+    """
+    columns = {}
+    for name in fields:
+        columns.update(dict.fromkeys(field_columns.get(name, (name,))))
+    return list(columns)
+
+
+def project(queryset, columns):
+    """
+    Load only `columns` of `queryset`, joining the relations they go through and no
+    other.
+    """
+    relations = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+    if relations:
+        # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetMixin:
+    """
+    For model serializers: only the fields in the `fields` context are rendered.
+    `field_columns` lists the columns of the fields that are not a column of the same
+    name.
+    """
+
+    field_columns = {}
+
+    def get_fields(self):
+        return select_fields(super().get_fields(), self.context.get("fields"))
+
+    def get_columns(self):
+        return get_columns(self.fields, self.field_columns)
@@ -0,0 +1,230 @@
+"""
+Per request instrumentation, enabled with the `REQUEST_METRICS` setting.
+
+`core.middleware.request_metrics_middleware` measures each request while it runs: the
+SQL queries and their time through a database execute wrapper, the hits, misses and
+time of the cache, the time serializers take to turn rows into the payload and the time
+the renderers take to encode it. The totals are added up per view in redis, so the
+numbers of every worker end up in one place, and go to the `Server-Timing` header of
+the response when `SERVER_TIMING` is on:
+
+- `metrics:endpoints`: set of the view names measured.
+- `metrics:endpoint:<view name>`: hash of the request count, the sums of the measures
+  and one counter per histogram bucket, e.g. `duration_ms:<=50` counts the requests
+  that took more than the previous bound and at most 50ms.
+
+`get_endpoint_stats` reads them back for the admin endpoint.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics:"
+ENDPOINTS_KEY = f"{KEY_PREFIX}endpoints"
+
+# upper bounds of the histogram buckets, the last bucket takes everything above
+HISTOGRAMS = {
+    "duration_ms": (5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+    "queries": (0, 1, 2, 5, 10, 20, 50),
+}
+SUMS = ("duration_ms", "db_ms", "queries", "cache_ms", "serialize_ms", "render_ms")
+COUNTS = ("cache_hits", "cache_misses")
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        # the spans running, so a nested serializer or renderer isn't counted twice
+        self.spans = set()
+
+    def stop(self):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+
+    def get_server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+                f'cache;dur={self.cache_ms:.1f};desc="{self.cache_hits} hits,'
+                f' {self.cache_misses} misses"',
+                f"serialize;dur={self.serialize_ms:.1f}",
+                f"render;dur={self.render_ms:.1f}",
+                f"total;dur={self.duration_ms:.1f}",
+            ]
+        )
+
+
+@contextmanager
+def measure():
+    """
+    Measure the code run in the block, in this context and the threads it calls.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        metrics.stop()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting the queries of the measured request.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Add `record_query` to the execute wrappers of `connection`, once. Connected to
+    `connection_created`.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def record_cache(hits, misses, seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+        metrics.cache_ms += seconds * 1000
+
+
+@contextmanager
+def record_span(name):
+    """
+    Add the time of the block to `<name>_ms`, unless it runs inside a span of the same
+    name.
+    """
+    metrics = _current.get()
+    if metrics is None or name in metrics.spans:
+        yield
+        return
+
+    metrics.spans.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.spans.discard(name)
+        elapsed = (time.perf_counter() - start) * 1000
+        setattr(metrics, f"{name}_ms", getattr(metrics, f"{name}_ms") + elapsed)
+
+
+def record_serialize():
+    return record_span("serialize")
+
+
+def record_render():
+    return record_span("render")
+
+
+class SerializeMetricsMixin:
+    """
+    Measure `to_representation` of a DRF serializer as serialize time.
+    """
+
+    def to_representation(self, instance):
+        with record_serialize():
+            return super().to_representation(instance)
+
+
+def endpoint_key(view_name):
+    return f"{KEY_PREFIX}endpoint:{view_name}"
+
+
+def get_bucket(value, bounds):
+    for bound in bounds:
+        if value <= bound:
+            return f"<={bound}"
+    return f">{bounds[-1]}"
+
+
+def store(view_name, metrics):
+    """
+    Add the measures of a request of `view_name` to its totals and histograms. Metrics
+    are lost rather than failing the request when redis is down.
+    """
+    key = endpoint_key(view_name)
+    pipe = get_redis_connection().pipeline(transaction=False)
+    pipe.sadd(ENDPOINTS_KEY, view_name)
+    pipe.hincrby(key, "count", 1)
+    for name in SUMS:
+        pipe.hincrbyfloat(key, name, getattr(metrics, name))
+    for name in COUNTS:
+        pipe.hincrby(key, name, getattr(metrics, name))
+    for name, bounds in HISTOGRAMS.items():
+        pipe.hincrby(key, f"{name}:{get_bucket(getattr(metrics, name), bounds)}", 1)
+    try:
+        pipe.execute()
+    except RedisError:
+        logger.warning("Could not store the metrics of %s", view_name, exc_info=True)
+
+
+def get_endpoint_stats():
+    """
+    {view name: stats} of every view measured, with the average of each measure and the
+    histograms, bucket by bucket.
+    """
+    connection = get_redis_connection()
+    view_names = sorted(name.decode() for name in connection.smembers(ENDPOINTS_KEY))
+    pipe = connection.pipeline(transaction=False)
+    for view_name in view_names:
+        pipe.hgetall(endpoint_key(view_name))
+
+    stats = {}
+    for view_name, values in zip(view_names, pipe.execute()):
+        values = {field.decode(): float(value) for field, value in values.items()}
+        count = int(values.get("count", 0))
+        if not count:
+            continue
+        stats[view_name] = {
+            "count": count,
+            "avg": {name: round(values.get(name, 0) / count, 3) for name in SUMS},
+            "cache": {name: int(values.get(name, 0)) for name in COUNTS},
+            "histograms": {
+                name: {
+                    bucket: int(values.get(f"{name}:{bucket}", 0))
+                    for bucket in [
+                        *(f"<={bound}" for bound in bounds),
+                        f">{bounds[-1]}",
+                    ]
+                }
+                for name, bounds in HISTOGRAMS.items()
+            },
+        }
+    return stats
+
+
+def reset_endpoint_stats():
+    connection = get_redis_connection()
+    view_names = connection.smembers(ENDPOINTS_KEY)
+    connection.delete(
+        ENDPOINTS_KEY, *(endpoint_key(name.decode()) for name in view_names)
+    )
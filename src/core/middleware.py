@@ -0,0 +1,127 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+
+from core import metrics
+from core.db.routers import use_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY_COOKIE_NAME = "primary_db"
+PRIMARY_COOKIE_SALT = "core.middleware.primary"
+
+
+def reads_primary(request):
+    """
+    Whether the request writes, or comes from a client that wrote in the last
+    `REPLICA_STICKY_SECONDS`.
+    """
+    if request.method not in SAFE_METHODS:
+        return True
+    return (
+        request.get_signed_cookie(
+            PRIMARY_COOKIE_NAME,
+            default=None,
+            salt=PRIMARY_COOKIE_SALT,
+            max_age=settings.REPLICA_STICKY_SECONDS,
+        )
+        is not None
+    )
+
+
+def stick_to_primary(request, response):
+    """
+    After a successful write, send the client's reads to the primary for
+    `REPLICA_STICKY_SECONDS`, until the replicas have its write.
+    """
+    if (
+        settings.REPLICA_DATABASES
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        response.set_signed_cookie(
+            PRIMARY_COOKIE_NAME,
+            "1",
+            salt=PRIMARY_COOKIE_SALT,
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def primary_replica_middleware(get_response):
+    """
+    Reads of requests that write, and of the requests that follow a write, go to the
+    primary database, see core/db/routers.py.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if reads_primary(request):
+                with use_primary():
+                    response = await get_response(request)
+            else:
+                response = await get_response(request)
+            return stick_to_primary(request, response)
+
+    else:
+
+        def middleware(request):
+            if reads_primary(request):
+                with use_primary():
+                    response = get_response(request)
+            else:
+                response = get_response(request)
+            return stick_to_primary(request, response)
+
+    return middleware
+
+
+def get_view_name(request):
+    resolver_match = request.resolver_match
+    return resolver_match.view_name if resolver_match else "unresolved"
+
+
+def add_server_timing(response, request_metrics):
+    if settings.SERVER_TIMING:
+        response["Server-Timing"] = request_metrics.get_server_timing()
+    return response
+
+
+@sync_and_async_middleware
+def request_metrics_middleware(get_response):
+    """
+    Measure the queries, cache lookups and rendering of each request and add them up
+    per view, see core/metrics.py.
+    """
+    if not settings.REQUEST_METRICS:
+        raise MiddlewareNotUsed
+
+    # connections opened from now on, in any thread
+    connection_created.connect(metrics.install_query_recorder)
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with metrics.measure() as request_metrics:
+                response = await get_response(request)
+            await sync_to_async(metrics.store)(get_view_name(request), request_metrics)
+            return add_server_timing(response, request_metrics)
+
+    else:
+
+        def middleware(request):
+            # connections this thread opened before the middleware was loaded
+            for connection in connections.all(initialized_only=True):
+                metrics.install_query_recorder(connection)
+
+            with metrics.measure() as request_metrics:
+                response = get_response(request)
+            metrics.store(get_view_name(request), request_metrics)
+            return add_server_timing(response, request_metrics)
+
+    return middleware
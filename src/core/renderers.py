@@ -0,0 +1,77 @@
+"""
+Renderers used by every endpoint, see `DEFAULT_RENDERER_CLASSES`.
+
+`ORJSONRenderer` produces the same bytes as DRF's `JSONRenderer` for our payloads:
+values orjson can't encode itself (Decimal, lazy strings, querysets) go through DRF's
+`JSONEncoder`, and so do datetimes, which DRF writes with a `Z` for UTC and times,
+which it truncates to milliseconds. Fields formatted by `DATETIME_FORMAT` are already
+strings when they get here. Pretty printed output, e.g. for the browsable API, is left to `JSONRenderer`.
+
+`MessagePackRenderer` is only picked when a client asks for `application/msgpack`.
+
+Every renderer records its time as the render measure of core/metrics.py.
+"""
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.renderers import BrowsableAPIRenderer as _BrowsableAPIRenderer
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.metrics import record_render
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            with record_render():
+                return super().render(data, accepted_media_type, renderer_context)
+
+        with record_render():
+            ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+            # like JSONRenderer, escape U+2028 and U+2029 so the output is valid
+            # javascript
+            if b"\xe2\x80" in ret:
+                ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9", b"\\u2029"
+                )
+        return ret
+
+
+class BrowsableAPIRenderer(_BrowsableAPIRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # includes the JSON rendered into the page, which isn't counted twice
+        with record_render():
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    The JSON payload in MessagePack, for internal clients. Types MessagePack has no
+    encoding for are converted as for JSON, so both carry the same values.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with record_render():
+            return msgpack.packb(
+                data, default=encode_default, use_bin_type=True, datetime=False
+            )
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 from datetime import timedelta
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,7 +23,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config("SECRET_KEY")
 DEBUG = config("DEBUG", cast=bool)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = config("ALLOWED_HOSTS", default="", cast=Csv())
 
 # Application definition
 
@@ -37,7 +37,6 @@ INSTALLED_APPS = [
     # 'django.contrib.sites',
     # 3rd party apps
     "corsheaders",
-    "debug_toolbar",
     "django_filters",
     "rest_framework",
     "rest_framework.authtoken",
@@ -56,7 +55,7 @@ INTERNAL_IPS = [
 ]
 
 MIDDLEWARE = [
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "core.middleware.request_metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -64,8 +63,14 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.primary_replica_middleware",
 ]
 
+# django-debug-toolbar is a development requirement
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -89,17 +94,64 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Connections are kept open for CONN_MAX_AGE seconds and checked before they are
+# reused. With DATABASE_POOL, meant for the ASGI server, they go back to an in-process
+# pool after each request instead, see core/db/pool.py. Behind pgbouncer in transaction
+# mode, set DISABLE_SERVER_SIDE_CURSORS.
+DATABASE_POOL = config("DATABASE_POOL", default=False, cast=bool)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": (
+            "core.db.backends.pooled"
+            if DATABASE_POOL
+            else "django.db.backends.postgresql_psycopg2"
+        ),
         "NAME": config("POSTGRES_DB"),
         "USER": config("POSTGRES_USER"),
         "PASSWORD": config("POSTGRES_PASSWORD"),
         "HOST": config("POSTGRES_HOST"),
-        "PORT": 5432,
+        "PORT": config("POSTGRES_PORT", default=5432, cast=int),
+        "CONN_MAX_AGE": (
+            0 if DATABASE_POOL else config("CONN_MAX_AGE", default=60, cast=int)
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": config(
+            "DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool
+        ),
+        "OPTIONS": (
+            {
+                "pool": {
+                    "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+                    "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=int),
+                }
+            }
+            if DATABASE_POOL
+            else {}
+        ),
     }
 }
 
+# Read replicas of the primary, "host" or "host:port" separated by commas. Reads go to a
+# replica, except those of requests that write and of a client's requests in the
+# REPLICA_STICKY_SECONDS after it wrote, see core/db/routers.py. The tests read the
+# replicas from the test database.
+REPLICA_DATABASES = []
+for index, replica in enumerate(config("DATABASE_REPLICAS", default="", cast=Csv()), 1):
+    host, _, port = replica.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": int(port or 5432),
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["core.db.routers.PrimaryReplicaRouter"]
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=5, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -162,7 +214,48 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DATETIME_FORMAT": "%Y-%m-%d %H:%M:%S",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.BrowsableAPIRenderer",
+        # only picked with `Accept: application/msgpack`
+        "core.renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "core.parsers.MessagePackParser",
+    ],
 }
+
+# Default pagination of the post list: "page" (page numbers with totals) or "cursor" (keyset).
+# A single request can override it with ?pagination=page|cursor.
+POST_PAGINATION_MODE = config("POST_PAGINATION_MODE", default="page")
+
+# How PostPagination gets total_posts: "exact", "cached", "estimate" or "omitted".
+# See blog/api/v1/paginations.py.
+POST_PAGINATION_COUNT = config("POST_PAGINATION_COUNT", default="exact")
+POST_PAGINATION_COUNT_CACHE_TIMEOUT = config(
+    "POST_PAGINATION_COUNT_CACHE_TIMEOUT", default=300, cast=int
+)
+POST_PAGINATION_ESTIMATE_THRESHOLD = config(
+    "POST_PAGINATION_ESTIMATE_THRESHOLD", default=10000, cast=int
+)
+
+# Seconds a post list page stays in the cache. Writes invalidate pages earlier by tag,
+# see blog/caches.py.
+POST_LIST_CACHE_TIMEOUT = config("POST_LIST_CACHE_TIMEOUT", default=60, cast=int)
+
+# Buffer like toggles in redis and write them to the database every LIKES_FLUSH_INTERVAL
+# seconds, see blog/pending_likes.py.
+LIKES_WRITE_BEHIND = config("LIKES_WRITE_BEHIND", default=False, cast=bool)
+LIKES_FLUSH_INTERVAL = config("LIKES_FLUSH_INTERVAL", default=10, cast=int)
+
+# Measure the queries, cache lookups and rendering of every request, add them up per
+# view in redis and send them in a Server-Timing header, see core/metrics.py.
+REQUEST_METRICS = config("REQUEST_METRICS", default=True, cast=bool)
+# off by default, the header shows every client how many queries a request runs
+SERVER_TIMING = config("SERVER_TIMING", default=False, cast=bool)
 # PASSWORD_RESET_TIMEOUT = 60
 
 SIMPLE_JWT = {
@@ -207,7 +300,7 @@ CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "core.cache.InstrumentedRedisCache",
         "LOCATION": "redis://redis:6379/2",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
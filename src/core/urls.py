@@ -7,6 +7,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from core.views import DatabaseStatsView, RequestMetricsView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Blog API",
@@ -24,7 +26,11 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/blog/", include("blog.urls")),
     path("api/v1/accounts/", include("accounts.urls")),
-    path("__debug__/", include("debug_toolbar.urls")),
+    # async read endpoints, for the ASGI server
+    path("api/v1/async/blog/", include("blog.api.v1.async_urls")),
+    path("api/v1/async/accounts/", include("accounts.api.v1.async_urls")),
+    path("api/v1/ops/database/", DatabaseStatsView.as_view(), name="database-stats"),
+    path("api/v1/ops/metrics/", RequestMetricsView.as_view(), name="request-metrics"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -38,3 +44,4 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,36 @@
+from django.db import connections
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db.pool import get_database_stats
+from core.metrics import get_endpoint_stats, reset_endpoint_stats
+
+
+class DatabaseStatsView(APIView):
+    """
+    Connection reuse of each database, and the usage of the connection pools of the
+    worker process that answers.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_database_stats(connections))
+
+
+class RequestMetricsView(APIView):
+    """
+    Queries, cache lookups, rendering and duration of the requests of each view, added
+    up by every worker since the last reset. DELETE resets them.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_endpoint_stats())
+
+    def delete(self, request):
+        reset_endpoint_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,6 +1,8 @@
 import json
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -67,6 +69,29 @@ class TestGetComment:
         assert response.status_code == status.HTTP_200_OK
         assert len(json_response["results"]) == 2
 
+    def test_list_only_the_requested_fields(
+        self, api_client, create_comment, create_post, media_root
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(
+                f"{post_url}{create_post.slug}/comments/?fields=comment,id"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"id": create_comment.id, "comment": create_comment.comment}
+        ]
+        assert not any("accounts_user" in query["sql"] for query in queries)
+
+    def test_list_unknown_field_return_400(
+        self, api_client, create_comment, create_post, media_root
+    ):
+        response = api_client.get(
+            f"{post_url}{create_post.slug}/comments/?fields=password"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_get_a_single_comment_return_200(
         self, api_client, create_comment, create_post, media_root
     ):
@@ -193,3 +218,48 @@ class TestDeleteComment:
         )
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestPostDetailComments:
+    def test_comment_pages_follow_creation_order(
+        self, api_client, create_post, comment_factory, media_root
+    ):
+        comments = comment_factory.create_batch(size=5, comment_post=create_post)
+
+        ids = []
+        url = f"{post_url}{create_post.slug}/"
+        while url:
+            response = api_client.get(url)
+            ids += [comment["id"] for comment in response.data["results"]["comments"]]
+            url = response.data["next"]
+
+        assert ids == [comment.id for comment in comments]
+
+    def test_only_the_requested_comments_are_loaded(
+        self, api_client, create_post, comment_factory, media_root
+    ):
+        comment_factory.create_batch(size=10, comment_post=create_post)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"{post_url}{create_post.slug}/")
+        comment_queries = [
+            query["sql"] for query in queries if 'FROM "blog_comment"' in query["sql"]
+        ]
+
+        assert len(response.data["results"]["comments"]) == 2
+        assert len(comment_queries) == 1
+        assert "LIMIT 3" in comment_queries[0]
+
+    def test_query_count_does_not_depend_on_comment_volume(
+        self, api_client, post_factory, create_category, comment_factory, media_root
+    ):
+        quiet_post, busy_post = post_factory.create_batch(2, category=create_category)
+        comment_factory.create(comment_post=quiet_post)
+        comment_factory.create_batch(size=20, comment_post=busy_post)
+
+        with CaptureQueriesContext(connection) as quiet_queries:
+            api_client.get(f"{post_url}{quiet_post.slug}/")
+        with CaptureQueriesContext(connection) as busy_queries:
+            api_client.get(f"{post_url}{busy_post.slug}/")
+
+        assert len(quiet_queries) == len(busy_queries)
@@ -0,0 +1,112 @@
+import pytest
+from psycopg2 import extensions
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, connections
+from django.urls import reverse
+from rest_framework import status
+
+from core.db.backends.pooled.base import DatabaseWrapper
+from core.db.pool import close_pool
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+database_stats_url = reverse("database-stats")
+
+
+@pytest.fixture
+def pooled_connection():
+    """
+    A pooled connection to the test database, one connection at most.
+    """
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "ENGINE": "core.db.backends.pooled",
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {"pool": {"max_size": 1, "timeout": 0.1}},
+    }
+    wrappers = []
+
+    def make_connection():
+        wrappers.append(DatabaseWrapper(settings_dict, alias="pooled"))
+        return wrappers[-1]
+
+    yield make_connection
+    for wrapper in wrappers:
+        wrapper.close()
+    close_pool("pooled")
+
+
+def get_backend_pid(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+class TestConnectionPool:
+    def test_closed_connection_is_reused(self, pooled_connection):
+        wrapper = pooled_connection()
+        pid = get_backend_pid(wrapper)
+        wrapper.close()
+
+        assert get_backend_pid(wrapper) == pid
+        stats = wrapper.pool.stats()
+        assert stats["size"] == 1
+        assert stats["checkouts"] == 2
+
+    def test_checkout_times_out_when_pool_is_exhausted(self, pooled_connection):
+        first, second = pooled_connection(), pooled_connection()
+        get_backend_pid(first)
+
+        with pytest.raises(OperationalError):
+            second.ensure_connection()
+
+        assert first.pool.stats()["timeouts"] == 1
+        first.close()
+        get_backend_pid(second)
+
+    def test_dead_connection_is_replaced(self, pooled_connection):
+        wrapper = pooled_connection()
+        pid = get_backend_pid(wrapper)
+        wrapper.close()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        assert get_backend_pid(wrapper) != pid
+        assert wrapper.pool.stats()["discarded"] == 1
+
+    def test_open_transaction_is_rolled_back(self, pooled_connection):
+        wrapper = pooled_connection()
+        wrapper.set_autocommit(False)
+        get_backend_pid(wrapper)
+        wrapper.close()
+
+        wrapper.ensure_connection()
+        assert (
+            wrapper.connection.info.transaction_status
+            == extensions.TRANSACTION_STATUS_IDLE
+        )
+        assert wrapper.get_autocommit()
+
+
+class TestDatabaseStats:
+    def test_common_user_can_not_get_database_stats_return_403(
+        self, api_client, create_user
+    ):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.get(database_stats_url)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_user_get_database_stats_return_200(self, api_client):
+        api_client.force_authenticate(user=User(is_staff=True))
+
+        response = api_client.get(database_stats_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        default = response.data["databases"]["default"]
+        assert default["conn_health_checks"] is True
+        assert default["engine"] == settings.DATABASES["default"]["ENGINE"]
@@ -0,0 +1,112 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+
+from blog.models import Post
+from core.db.routers import use_primary
+from core.middleware import PRIMARY_COOKIE_NAME, primary_replica_middleware
+
+post_url = reverse("blog:api-v1:posts-list")
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ["replica_1"]
+
+
+def read_database(request):
+    """
+    A view answering with the database its reads go to.
+    """
+    return HttpResponse(router.db_for_read(Post))
+
+
+class TestPrimaryReplicaRouter:
+    def test_reads_go_to_primary_without_replicas(self, settings):
+        settings.REPLICA_DATABASES = []
+
+        assert router.db_for_read(Post) == "default"
+
+    def test_reads_go_to_a_replica(self, replicas):
+        assert router.db_for_read(Post) == "replica_1"
+        assert router.db_for_write(Post) == "default"
+
+    def test_reads_in_use_primary_go_to_primary(self, replicas):
+        with use_primary():
+            assert router.db_for_read(Post) == "default"
+
+        assert router.db_for_read(Post) == "replica_1"
+
+    @pytest.mark.django_db
+    def test_reads_in_a_transaction_go_to_primary(self, replicas):
+        # every test with the database runs in a transaction
+        assert router.db_for_read(Post) == "default"
+
+    def test_only_primary_is_migrated(self, replicas):
+        assert router.allow_migrate("default", "blog")
+        assert not router.allow_migrate("replica_1", "blog")
+
+
+class TestPrimaryReplicaMiddleware:
+    def test_write_reads_primary_and_sticks_to_it(self, replicas):
+        middleware = primary_replica_middleware(read_database)
+
+        response = middleware(RequestFactory().post("/"))
+
+        assert response.content == b"default"
+        assert PRIMARY_COOKIE_NAME in response.cookies
+
+    def test_reads_primary_after_a_write(self, replicas):
+        middleware = primary_replica_middleware(read_database)
+        cookie = middleware(RequestFactory().post("/")).cookies[PRIMARY_COOKIE_NAME]
+
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_COOKIE_NAME] = cookie.value
+        response = middleware(request)
+
+        assert response.content == b"default"
+        assert PRIMARY_COOKIE_NAME not in response.cookies
+
+    def test_read_goes_to_a_replica(self, replicas):
+        middleware = primary_replica_middleware(read_database)
+
+        response = middleware(RequestFactory().get("/"))
+
+        assert response.content == b"replica_1"
+
+    def test_forged_cookie_reads_a_replica(self, replicas):
+        middleware = primary_replica_middleware(read_database)
+
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_COOKIE_NAME] = "1"
+        response = middleware(request)
+
+        assert response.content == b"replica_1"
+
+    def test_async_write_reads_primary(self, replicas):
+        async def async_read_database(request):
+            return read_database(request)
+
+        middleware = primary_replica_middleware(async_read_database)
+
+        response = async_to_sync(middleware)(RequestFactory().post("/"))
+
+        assert response.content == b"default"
+        assert PRIMARY_COOKIE_NAME in response.cookies
+
+    @pytest.mark.django_db
+    def test_comment_sticks_to_primary(
+        self, api_client, create_user, media_root, create_post, replicas
+    ):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(
+            f"{post_url}{create_post.slug}/comments/", data={"comment": "Fresh"}
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert PRIMARY_COOKIE_NAME in response.cookies
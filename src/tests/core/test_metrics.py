@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+post_url = reverse("blog:api-v1:posts-list")
+metrics_url = reverse("request-metrics")
+
+
+@pytest.fixture
+def admin_client(api_client):
+    api_client.force_authenticate(user=User(is_staff=True))
+    return api_client
+
+
+class TestRequestMetrics:
+    def test_response_has_server_timing(
+        self, api_client, media_root, post_factory, create_category, settings
+    ):
+        settings.SERVER_TIMING = True
+        post_factory.create_batch(3, category=create_category)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(post_url)
+
+        server_timing = response["Server-Timing"]
+        assert f'desc="{len(queries)} queries"' in server_timing
+        assert 'desc="0 hits,' in server_timing
+        assert "serialize;dur=" in server_timing
+        assert "render;dur=" in server_timing
+        assert "total;dur=" in server_timing
+
+    def test_server_timing_is_off_by_default(self, api_client):
+        response = api_client.get(post_url)
+
+        assert "Server-Timing" not in response
+
+    def test_serialize_and_render_are_measured(
+        self, admin_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(3, category=create_category)
+        admin_client.get(post_url)
+        admin_client.get(post_url, HTTP_ACCEPT="text/html")
+
+        response = admin_client.get(metrics_url)
+
+        stats = response.data["blog:api-v1:posts-list"]
+        assert stats["avg"]["serialize_ms"] > 0
+        assert stats["avg"]["render_ms"] > 0
+
+    def test_requests_are_added_up_per_view(
+        self, api_client, admin_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(3, category=create_category)
+        api_client.get(post_url)
+        # served from the cache
+        api_client.get(post_url)
+
+        response = admin_client.get(metrics_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.data["blog:api-v1:posts-list"]
+        assert stats["count"] == 2
+        assert stats["cache"]["cache_hits"] > 0
+        assert stats["avg"]["queries"] > 0
+        assert sum(stats["histograms"]["duration_ms"].values()) == 2
+        assert sum(stats["histograms"]["queries"].values()) == 2
+
+    def test_delete_resets_metrics(self, api_client, admin_client):
+        api_client.get(post_url)
+
+        response = admin_client.delete(metrics_url)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert "blog:api-v1:posts-list" not in admin_client.get(metrics_url).data
+
+    def test_common_user_can_not_get_metrics_return_403(self, api_client, create_user):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.get(metrics_url)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,129 @@
+import datetime
+import decimal
+import io
+import uuid
+from collections import OrderedDict
+
+import msgpack
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import MessagePackParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+
+payload = OrderedDict(
+    [
+        ("id", 1),
+        ("title", "ünïcode \u2028 and \u2029"),
+        ("price", decimal.Decimal("10.50")),
+        ("lazy", gettext_lazy("Post not found.")),
+        ("uuid", uuid.UUID("12345678-1234-5678-1234-567812345678")),
+        (
+            "at",
+            datetime.datetime(2024, 4, 13, 4, 26, 1, 123456, datetime.timezone.utc),
+        ),
+        ("day", datetime.date(2024, 4, 13)),
+        ("time", datetime.time(4, 26, 1, 123456)),
+        ("naive", datetime.datetime(2024, 4, 13, 4, 26)),
+        ("nested", [{"none": None, "ok": True}, (1, 2.5)]),
+        (3, "int key"),
+    ]
+)
+
+
+def test_orjson_renderer_matches_json_renderer():
+    assert ORJSONRenderer().render(payload) == JSONRenderer().render(payload)
+
+
+def test_orjson_renderer_indents_like_json_renderer():
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(payload, media_type) == JSONRenderer().render(
+        payload, media_type
+    )
+
+
+def test_msgpack_holds_the_json_values():
+    data = msgpack.unpackb(
+        MessagePackRenderer().render(payload), raw=False, strict_map_key=False
+    )
+
+    assert data["price"] == 10.5
+    assert data["at"] == "2024-04-13T04:26:01.123456Z"
+
+
+def test_msgpack_is_picked_by_accept_header(
+    api_client, post_factory, create_category, media_root
+):
+    post_factory.create_batch(2, category=create_category)
+
+    as_json = api_client.get(post_url)
+    as_msgpack = api_client.get(post_url, HTTP_ACCEPT="application/msgpack")
+
+    assert as_json["Content-Type"] == "application/json"
+    assert as_msgpack["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content, raw=False) == as_json.json()
+    assert as_msgpack["ETag"] != as_json["ETag"]
+
+
+def test_msgpack_request_body(api_client, create_user):
+    api_client.force_authenticate(user=create_user)
+
+    response = api_client.post(
+        reverse("blog:api-v1:likes-toggle"),
+        msgpack.packb({"slugs": ["missing"]}),
+        content_type="application/msgpack",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["not_found"] == ["missing"]
+
+
+def test_invalid_json_body_return_400(api_client, create_user):
+    api_client.force_authenticate(user=create_user)
+
+    response = api_client.post(
+        reverse("blog:api-v1:likes-toggle"), b"{", content_type="application/json"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"\x81\x91\x01\x01",  # a map keyed by a list
+        b"\x01\x02",  # extra data
+        b"\x92\x01",  # incomplete array
+        b"\xc1",  # reserved type
+        b"\x91" * 2000,  # nested too deep
+    ],
+)
+def test_invalid_msgpack_body_return_400(api_client, create_user, body):
+    api_client.force_authenticate(user=create_user)
+
+    response = api_client.post(
+        reverse("blog:api-v1:likes-toggle"), body, content_type="application/msgpack"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("error", [TypeError, msgpack.UnpackException])
+def test_msgpack_parser_wraps_unpack_errors(monkeypatch, error):
+    def unpackb(*args, **kwargs):
+        raise error("unhashable type: 'dict'")
+
+    monkeypatch.setattr(msgpack, "unpackb", unpackb)
+
+    with pytest.raises(ParseError):
+        MessagePackParser().parse(io.BytesIO(b"\x81\x81\x01\x01\x01"))
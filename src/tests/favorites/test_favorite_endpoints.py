@@ -0,0 +1,185 @@
+import pytest
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from accounts.models import Profile
+from blog.caches import favorite_posts_cache_key
+from blog.models import FavoritePost
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+profile_url = reverse("accounts:api-v1:profile")
+
+
+class TestFavorites:
+    def test_anonymous_user_can_not_favorite_a_post_return_401(
+        self, api_client, create_post, media_root
+    ):
+        response = api_client.post(f"{post_url}{create_post.slug}/favorite/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_toggle_favorite_in_one_query(
+        self, api_client, create_user, create_post, media_root
+    ):
+        api_client.force_authenticate(user=create_user)
+        url = f"{post_url}{create_post.slug}/favorite/"
+
+        with CaptureQueriesContext(connection) as queries:
+            added = api_client.post(url)
+        assert len(queries) == 1
+        assert FavoritePost.objects.filter(
+            user__user=create_user, post=create_post
+        ).exists()
+
+        removed = api_client.post(url)
+
+        assert added.data["detail"] == "This post has been added to your favorites."
+        assert removed.data["detail"] == (
+            "This post has been removed from your favorites."
+        )
+        assert not FavoritePost.objects.exists()
+
+    def test_favorite_a_missing_post_return_404(self, api_client, create_user):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(f"{post_url}missing/favorite/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_user_without_profile_can_favorite_a_post(
+        self, api_client, create_user, create_post, media_root
+    ):
+        Profile.objects.filter(user=create_user).delete()
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(f"{post_url}{create_post.slug}/favorite/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert FavoritePost.objects.filter(
+            user__user=create_user, post=create_post
+        ).exists()
+
+    def test_user_without_profile_favorite_a_missing_post_return_404(
+        self, api_client, create_user
+    ):
+        Profile.objects.filter(user=create_user).delete()
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(f"{post_url}missing/favorite/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["detail"] == "Post not found."
+
+    def test_favorite_is_unique(self, create_user, create_post, media_root):
+        FavoritePost.objects.create(user=create_user.profile, post=create_post)
+
+        with pytest.raises(IntegrityError):
+            FavoritePost.objects.create(user=create_user.profile, post=create_post)
+
+    def test_toggle_refreshes_profile_favorites(
+        self,
+        api_client,
+        create_user,
+        post_factory,
+        create_category,
+        media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        cached, toggled = post_factory.create_batch(size=2, category=create_category)
+        FavoritePost.objects.create(user=create_user.profile, post=cached)
+        api_client.force_authenticate(user=create_user)
+        assert len(api_client.get(profile_url).data["results"]["favoritepost"]) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f"{post_url}{toggled.slug}/favorite/")
+        response = api_client.get(profile_url)
+
+        assert len(response.data["results"]["favoritepost"]) == 2
+
+
+class TestProfileFavorites:
+    def test_profile_favorites_are_paginated_by_cursor(
+        self, media_root, api_client, create_user, post_factory, create_category
+    ):
+        posts = post_factory.create_batch(size=12, category=create_category)
+        for post in posts:
+            FavoritePost.objects.create(user=create_user.profile, post=post)
+        api_client.force_authenticate(user=create_user)
+
+        first_page = api_client.get(profile_url)
+        second_page = api_client.get(first_page.data["next"])
+        back = api_client.get(second_page.data["previous"])
+
+        newest_first = [post.id for post in reversed(posts)]
+        assert first_page.data["count"] == 12
+        assert [
+            favorite["post"]["id"]
+            for page in (first_page, second_page)
+            for favorite in page.data["results"]["favoritepost"]
+        ] == newest_first
+        assert second_page.data["next"] is None
+        assert back.data["results"] == first_page.data["results"]
+
+    def test_cache_holds_only_ids(
+        self, media_root, api_client, create_user, create_post
+    ):
+        favorite = FavoritePost.objects.create(
+            user=create_user.profile, post=create_post
+        )
+        api_client.force_authenticate(user=create_user)
+
+        api_client.get(profile_url)
+
+        assert cache.get(favorite_posts_cache_key(create_user.profile.id)) == [
+            favorite.id
+        ]
+
+    def test_cached_page_is_loaded_in_one_query(
+        self, media_root, api_client, create_user, post_factory, create_category
+    ):
+        for post in post_factory.create_batch(size=3, category=create_category):
+            FavoritePost.objects.create(user=create_user.profile, post=post)
+        api_client.force_authenticate(user=create_user)
+        api_client.get(profile_url)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(profile_url)
+
+        # the profile, then the favorites of the page with their posts
+        assert len(queries) == 2
+
+    def test_profile_fields_without_favorites_skip_them(
+        self, media_root, api_client, create_user, create_post
+    ):
+        FavoritePost.objects.create(user=create_user.profile, post=create_post)
+        api_client.force_authenticate(user=create_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"{profile_url}?fields=id,bio")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == {
+            "id": create_user.profile.id,
+            "bio": create_user.profile.bio,
+        }
+        # the profile alone, without joining the user
+        assert len(queries) == 1
+        assert "accounts_user" not in queries[0]["sql"]
+
+    def test_profile_fields_with_favorites(
+        self, media_root, api_client, create_user, create_post
+    ):
+        FavoritePost.objects.create(user=create_user.profile, post=create_post)
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.get(f"{profile_url}?fields=email,favoritepost")
+
+        assert list(response.data["results"]) == ["email", "favoritepost"]
+        assert response.data["results"]["email"] == create_user.email
+        assert len(response.data["results"]["favoritepost"]) == 1
@@ -1,8 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
+from blog import pending_likes
 from blog.models import Like
+from blog.services import toggle_like, toggle_likes
+from blog.tasks import flush_pending_likes
 
 pytestmark = pytest.mark.django_db
 
@@ -53,3 +61,279 @@ class TestLikes:
         like_factory.create(like_user=user[1], like_post=post[1])
 
         assert Like.objects.count() == 2
+
+    def test_like_toggle_keeps_like_count(
+        self, api_client, user_factory, post_factory, media_root
+    ):
+        user = user_factory.create()
+        post = post_factory.create()
+
+        api_client.force_authenticate(user=user)
+
+        api_client.post(f"{post_url}{post.slug}/like/")
+        post.refresh_from_db()
+        assert post.like_count == 1
+
+        api_client.post(f"{post_url}{post.slug}/like/")
+        post.refresh_from_db()
+        assert post.like_count == 0
+
+    def test_like_count_in_post_payload(
+        self, api_client, user_factory, post_factory, media_root
+    ):
+        user = user_factory.create()
+        post = post_factory.create()
+
+        api_client.force_authenticate(user=user)
+        api_client.post(f"{post_url}{post.slug}/like/")
+
+        response = api_client.get(f"{post_url}{post.slug}/")
+
+        assert response.data["results"]["likes"] == 1
+
+    def test_toggle_returns_state_and_count_in_one_query(
+        self, api_client, user_factory, post_factory, like_factory, media_root
+    ):
+        user, other_user = user_factory.create_batch(size=2)
+        post = post_factory.create()
+        like_factory.create(like_user=other_user, like_post=post)
+        post.like_count = 1
+        post.save()
+        api_client.force_authenticate(user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            liked = api_client.post(f"{post_url}{post.slug}/like/")
+        assert len(queries) == 1
+
+        unliked = api_client.post(f"{post_url}{post.slug}/like/")
+        assert liked.data == {"detail": "Like created.", "liked": True, "likes": 2}
+        assert unliked.data == {"detail": "Like deleted.", "liked": False, "likes": 1}
+
+    def test_like_a_missing_post_return_404(self, api_client, create_user):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(f"{post_url}missing/like/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_reconcile_like_counts_fixes_drift(
+        self, user_factory, post_factory, like_factory, create_category, media_root
+    ):
+        users = user_factory.create_batch(size=3)
+        post, other_post = post_factory.create_batch(size=2, category=create_category)
+        for user in users:
+            like_factory.create(like_user=user, like_post=post)
+        other_post.like_count = 7
+        other_post.save()
+
+        call_command("reconcile_like_counts", batch_size=1)
+
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        assert post.like_count == 3
+        assert other_post.like_count == 0
+
+
+class TestBatchLikes:
+    toggle_url = reverse("blog:api-v1:likes-toggle")
+    status_url = reverse("blog:api-v1:likes-status")
+
+    def test_anonymous_user_can_not_toggle_likes_return_401(self, api_client):
+        response = api_client.post(self.toggle_url, {"slugs": ["a"]}, format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_toggle_likes_and_unlikes_in_one_request(
+        self,
+        api_client,
+        create_user,
+        post_factory,
+        like_factory,
+        create_category,
+        media_root,
+    ):
+        liked, unliked = post_factory.create_batch(size=2, category=create_category)
+        like_factory.create(like_user=create_user, like_post=liked)
+        liked.like_count = 1
+        liked.save()
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(
+            self.toggle_url,
+            {"slugs": [liked.slug, unliked.slug, "missing"]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"slug": liked.slug, "liked": False, "likes": 0},
+            {"slug": unliked.slug, "liked": True, "likes": 1},
+        ]
+        assert response.data["not_found"] == ["missing"]
+        assert list(Like.objects.values_list("like_post_id", flat=True)) == [unliked.id]
+
+    def test_toggle_too_many_slugs_return_400(self, api_client, create_user):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(
+            self.toggle_url, {"slugs": [f"post-{i}" for i in range(51)]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_status(
+        self,
+        api_client,
+        create_user,
+        post_factory,
+        like_factory,
+        create_category,
+        media_root,
+    ):
+        liked, other = post_factory.create_batch(size=2, category=create_category)
+        like_factory.create(like_user=create_user, like_post=liked)
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.get(
+            self.status_url, {"slugs": f"{other.slug},{liked.slug}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [
+            (result["slug"], result["liked"]) for result in response.data["results"]
+        ] == [(other.slug, False), (liked.slug, True)]
+
+    @pytest.mark.parametrize("size", [1, 10])
+    def test_batch_queries_do_not_grow_with_slugs(
+        self, api_client, create_user, post_factory, create_category, media_root, size
+    ):
+        posts = post_factory.create_batch(size=size, category=create_category)
+        slugs = [post.slug for post in posts]
+        api_client.force_authenticate(user=create_user)
+
+        with CaptureQueriesContext(connection) as status_queries:
+            api_client.get(self.status_url, {"slugs": ",".join(slugs)})
+        with CaptureQueriesContext(connection) as toggle_queries:
+            api_client.post(self.toggle_url, {"slugs": slugs}, format="json")
+
+        assert len(status_queries) == 2
+        # savepoint, toggle, lock, like_count, counts, release
+        assert len(toggle_queries) == 6
+
+
+def toggle_in_thread(toggle, *args):
+    try:
+        return toggle(*args)
+    finally:
+        connection.close()
+
+
+def test_single_and_batch_toggles_run_together(
+    transactional_db, user_factory, post_factory, category_factory, media_root
+):
+    user = user_factory.create()
+    posts = post_factory.create_batch(size=3, category=category_factory.create())
+    slugs = [post.slug for post in posts]
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [
+            executor.submit(toggle_in_thread, toggle_like, user, slugs[i % 3])
+            for i in range(30)
+        ] + [
+            executor.submit(toggle_in_thread, toggle_likes, user, slugs)
+            for _ in range(30)
+        ]
+        for future in futures:
+            future.result()
+
+    for post in posts:
+        post.refresh_from_db()
+        assert post.like_count == Like.objects.filter(like_post=post).count()
+
+
+class TestWriteBehindLikes:
+    @pytest.fixture(autouse=True)
+    def write_behind(self, settings):
+        settings.LIKES_WRITE_BEHIND = True
+
+    def test_toggle_is_buffered_until_flush(
+        self, api_client, create_user, create_post, media_root
+    ):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(f"{post_url}{create_post.slug}/like/")
+
+        assert response.data["detail"] == "Like created."
+        assert not Like.objects.exists()
+
+        flush_pending_likes()
+
+        create_post.refresh_from_db()
+        assert Like.objects.filter(
+            like_user=create_user, like_post=create_post
+        ).exists()
+        assert create_post.like_count == 1
+
+    def test_reads_merge_pending_likes(
+        self, api_client, user_factory, create_post, like_factory, media_root
+    ):
+        liker, unliker = user_factory.create_batch(size=2)
+        like_factory.create(like_user=unliker, like_post=create_post)
+        create_post.like_count = 1
+        create_post.save()
+
+        for user in (liker, unliker):
+            api_client.force_authenticate(user=user)
+            api_client.post(f"{post_url}{create_post.slug}/like/")
+        status_response = api_client.get(
+            reverse("blog:api-v1:likes-status"), {"slugs": create_post.slug}
+        )
+        detail = api_client.get(f"{post_url}{create_post.slug}/")
+
+        assert status_response.data["results"] == [
+            {"slug": create_post.slug, "liked": False, "likes": 1}
+        ]
+        assert detail.data["results"]["likes"] == 1
+
+    def test_double_toggle_before_flush_leaves_no_like(
+        self, api_client, create_user, create_post, media_root
+    ):
+        api_client.force_authenticate(user=create_user)
+
+        api_client.post(f"{post_url}{create_post.slug}/like/")
+        response = api_client.post(f"{post_url}{create_post.slug}/like/")
+        flush_pending_likes()
+
+        create_post.refresh_from_db()
+        assert response.data["detail"] == "Like deleted."
+        assert not Like.objects.exists()
+        assert create_post.like_count == 0
+
+    def test_flush_retries_posts_of_a_failed_flush(
+        self, api_client, create_user, create_post, media_root
+    ):
+        api_client.force_authenticate(user=create_user)
+        api_client.post(f"{post_url}{create_post.slug}/like/")
+
+        # a flush that died before writing anything
+        pending_likes.take_pending_likes(batch_size=10)
+        flush_pending_likes()
+
+        assert Like.objects.filter(
+            like_user=create_user, like_post=create_post
+        ).exists()
+        assert pending_likes.get_pending_like_deltas([create_post.id]) == {
+            create_post.id: 0
+        }
+
+    def test_flush_stops_taking_batches_after_max_seconds(
+        self, api_client, create_user, post_factory, create_category, media_root
+    ):
+        posts = post_factory.create_batch(size=3, category=create_category)
+        api_client.force_authenticate(user=create_user)
+        for post in posts:
+            api_client.post(f"{post_url}{post.slug}/like/")
+
+        assert flush_pending_likes(batch_size=1, max_seconds=0) == 0
+        assert flush_pending_likes(batch_size=1) == 3
+        assert Like.objects.count() == 3
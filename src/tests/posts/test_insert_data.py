@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Q
+
+from accounts.models import Profile, User
+from blog.models import Comment, FavoritePost, Like, Post
+
+pytestmark = pytest.mark.django_db
+
+
+def test_insert_data():
+    call_command(
+        "insert_data",
+        users=20,
+        posts=50,
+        comments=100,
+        likes=200,
+        favorites=40,
+        chunk_size=15,
+        seed=1,
+        stdout=StringIO(),
+    )
+
+    assert User.objects.count() == 20
+    assert Profile.objects.count() == 20
+    assert Post.objects.count() == 50
+    assert Post.objects.values("slug").distinct().count() == 50
+    assert not Post.objects.filter(search_vector__isnull=True).exists()
+    assert Comment.objects.count() == 100
+    assert 0 < Like.objects.count() <= 200
+    assert 0 < FavoritePost.objects.count() <= 40
+    assert not (
+        Post.objects.annotate(likes=Count("like"))
+        .filter(~Q(like_count=F("likes")))
+        .exists()
+    )
+
+
+def test_insert_data_twice_with_the_same_seed():
+    for _ in range(2):
+        call_command("insert_data", users=3, posts=5, seed=1, stdout=StringIO())
+
+    assert User.objects.count() == 6
+    assert Post.objects.count() == 10
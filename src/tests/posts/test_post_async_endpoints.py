@@ -0,0 +1,148 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from blog.models import FavoritePost
+from core.db.routers import use_primary
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+async_post_url = reverse("blog-async:posts-list")
+
+
+def without_urls(data):
+    """
+    The payload without the absolute urls, which point to the endpoint that served it.
+    """
+    if isinstance(data, dict):
+        return {
+            key: without_urls(value)
+            for key, value in data.items()
+            if key not in ("absolute_url", "links", "next", "previous")
+        }
+    if isinstance(data, list):
+        return [without_urls(item) for item in data]
+    return data
+
+
+class TestAsyncPostEndpoints:
+    @pytest.mark.parametrize(
+        "query", ["", "?fields=id,title", "?expand=author,category,comments[:2]"]
+    )
+    def test_list_matches_the_sync_list(
+        self,
+        api_client,
+        media_root,
+        post_factory,
+        comment_factory,
+        create_category,
+        query,
+    ):
+        for post in post_factory.create_batch(3, category=create_category):
+            comment_factory.create_batch(size=2, comment_post=post)
+
+        sync = api_client.get(f"{post_url}{query}")
+        response = api_client.get(f"{async_post_url}{query}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert without_urls(response.json()) == without_urls(sync.json())
+        assert response["ETag"]
+
+    def test_list_is_cached_and_revalidated(
+        self, api_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(2, category=create_category)
+        etag = api_client.get(async_post_url)["ETag"]
+
+        response = api_client.get(async_post_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_revalidates_when_the_cache_is_bypassed(
+        self, api_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(2, category=create_category)
+        etag = api_client.get(async_post_url)["ETag"]
+
+        with use_primary():
+            response = api_client.get(async_post_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_matches_the_sync_detail(
+        self, api_client, media_root, create_post, comment_factory
+    ):
+        comment_factory.create_batch(size=3, comment_post=create_post)
+
+        sync = api_client.get(f"{post_url}{create_post.slug}/")
+        response = api_client.get(f"{async_post_url}{create_post.slug}/")
+        not_modified = api_client.get(
+            f"{async_post_url}{create_post.slug}/",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert without_urls(response.json()) == without_urls(sync.json())
+        assert response.json()["next"].startswith(
+            f"http://testserver{async_post_url}{create_post.slug}/?cursor="
+        )
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_missing_post_return_404(self, api_client):
+        response = api_client.get(f"{async_post_url}missing/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_comments_match_the_sync_comments(
+        self, api_client, media_root, create_post, comment_factory
+    ):
+        comment_factory.create_batch(size=3, comment_post=create_post)
+        url = reverse("blog-async:comments-list", args=[create_post.slug])
+
+        sync = api_client.get(f"{post_url}{create_post.slug}/comments/")
+        response = api_client.get(url)
+
+        assert without_urls(response.json()) == without_urls(sync.json())
+        assert len(response.json()["results"]) == 3
+
+    def test_categories_match_the_sync_categories(self, api_client, category_factory):
+        for name in ("news", "tech", "travel"):
+            category_factory.create(name=name)
+
+        sync = api_client.get(reverse("blog:api-v1:categories-list"))
+        response = api_client.get(reverse("blog-async:categories-list"))
+
+        assert response.json() == sync.json()
+
+    def test_writes_are_not_allowed(self, api_client, create_user):
+        api_client.force_authenticate(user=create_user)
+
+        response = api_client.post(async_post_url, data={"title": "title"})
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+class TestAsyncProfile:
+    url = reverse("accounts-async:profile")
+
+    def test_anonymous_user_return_401(self, api_client):
+        response = api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_profile_matches_the_sync_profile(
+        self, api_client, media_root, create_user, post_factory, create_category
+    ):
+        for post in post_factory.create_batch(size=3, category=create_category):
+            FavoritePost.objects.create(user=create_user.profile, post=post)
+        api_client.force_authenticate(user=create_user)
+        query = "?expand=category"
+
+        sync = api_client.get(f"{reverse('accounts:api-v1:profile')}{query}")
+        response = api_client.get(f"{self.url}{query}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == sync.json()
+        assert len(response.json()["results"]["favoritepost"]) == 3
@@ -0,0 +1,221 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.services import update_profile
+from blog.caches import can_cache_post_list
+from blog.models import Category
+from blog.services import create_comment, create_post, toggle_like, update_post
+from core.db.routers import use_primary
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+
+
+def count_queries(api_client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    return response, len(queries)
+
+
+def test_identical_list_request_is_served_from_cache(
+    api_client, post_factory, create_category, media_root
+):
+    post_factory.create_batch(3, category=create_category)
+
+    first, first_queries = count_queries(api_client, post_url)
+    second, second_queries = count_queries(api_client, post_url)
+
+    assert first_queries > 0
+    assert second_queries == 0
+    assert second.data == first.data
+
+
+def test_like_invalidates_pages_showing_the_post(
+    api_client,
+    user_factory,
+    post_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    post = post_factory.create(category=create_category)
+    api_client.get(post_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        toggle_like(user=user_factory.create(), slug=post.slug)
+
+    response, queries = count_queries(api_client, post_url)
+
+    assert queries > 0
+    assert response.data["results"][0]["likes"] == 1
+
+
+def test_comment_invalidates_pages_showing_the_post(
+    api_client,
+    create_user,
+    post_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    post = post_factory.create(category=create_category)
+    api_client.get(post_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_comment(user=create_user, post=post, comment="comment")
+
+    _, queries = count_queries(api_client, post_url)
+
+    assert queries > 0
+
+
+def test_new_post_invalidates_unfiltered_list(
+    api_client,
+    user_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    api_client.get(post_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_post(
+            user=user_factory.create(),
+            category=create_category,
+            title="title",
+            content="content",
+            image="image.jpg",
+            status=True,
+            published_at="2024-04-13 04:26:00",
+        )
+
+    response, _ = count_queries(api_client, post_url)
+
+    assert len(response.data["results"]) == 1
+
+
+def test_post_by_another_author_keeps_author_listing_cached(
+    api_client,
+    user_factory,
+    post_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    author, other_author = user_factory.create_batch(2)
+    post_factory.create(author=author, category=create_category)
+    other_post = post_factory.create(author=other_author, category=create_category)
+    url = f"{post_url}?author__in={author.email}"
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        update_post({"content": "changed"}, other_author, other_post.slug)
+    _, queries = count_queries(api_client, url)
+    assert queries == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        update_post({"content": "moved"}, author, other_post.slug)
+    response, queries = count_queries(api_client, url)
+    assert queries > 0
+    assert len(response.data["results"]) == 2
+
+
+def test_author_rename_invalidates_category_listing(
+    api_client,
+    create_user,
+    post_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    post_factory.create(author=create_user, category=create_category)
+    url = f"{post_url}?category__name={create_category.name}"
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        update_profile(create_user.profile, {"user": {"first_name": "Renamed"}})
+    response, queries = count_queries(api_client, url)
+
+    assert queries > 0
+    assert response.data["results"][0]["author"].startswith("Renamed ")
+
+
+def test_category_rename_invalidates_author_listing(
+    api_client,
+    create_user,
+    post_factory,
+    create_category,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    post_factory.create(author=create_user, category=create_category)
+    url = f"{post_url}?author__in={create_user.email}"
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_category.name = "Renamed"
+        create_category.save()
+    response, queries = count_queries(api_client, url)
+
+    assert queries > 0
+    assert response.data["results"][0]["category"] == "Renamed"
+
+
+def test_new_category_invalidates_matching_category_listing(
+    api_client,
+    create_user,
+    category_factory,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    category_factory.create(name="Sport")
+    url = f"{post_url}?category__name=spor"
+    assert api_client.get(url).data["results"] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category = Category.objects.create(name="Sports")
+    with django_capture_on_commit_callbacks(execute=True):
+        create_post(
+            user=create_user,
+            category=category,
+            title="title",
+            content="content",
+            image="image",
+            status=True,
+            published_at=timezone.now(),
+        )
+    response, queries = count_queries(api_client, url)
+
+    assert queries > 0
+    assert [post["category"] for post in response.data["results"]] == ["Sports"]
+
+
+def test_reads_from_the_primary_skip_the_cache(
+    api_client, post_factory, create_category, media_root
+):
+    post_factory.create_batch(2, category=create_category)
+    api_client.get(post_url)
+
+    with use_primary():
+        _, queries = count_queries(api_client, post_url)
+    assert queries > 0
+
+
+def test_recent_writes_are_not_cached_from_replicas(settings):
+    settings.REPLICA_DATABASES = ["replica_1"]
+    settings.REPLICA_STICKY_SECONDS = 5
+    bumped_before = time.time_ns() - 10 * 1_000_000_000
+
+    assert can_cache_post_list({"posts:all": bumped_before, "post:1": 0})
+    assert not can_cache_post_list(
+        {"posts:all": bumped_before, "post:1": time.time_ns()}
+    )
+    with use_primary():
+        assert not can_cache_post_list({"posts:all": bumped_before})
@@ -0,0 +1,118 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from blog.services import create_comment, toggle_like
+from core.db.routers import use_primary
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+
+
+class TestPostDetailConditionalGet:
+    def test_detail_has_validators(self, api_client, create_post, media_root):
+        response = api_client.get(f"{post_url}{create_post.slug}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"')
+        assert response["Last-Modified"]
+
+    def test_if_none_match_return_304_without_loading_the_post(
+        self, api_client, create_post, media_root
+    ):
+        url = f"{post_url}{create_post.slug}/"
+        etag = api_client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert len(queries) == 1
+        assert "blog_comment" not in queries[0]["sql"]
+
+    def test_if_modified_since_return_304(self, api_client, create_post, media_root):
+        url = f"{post_url}{create_post.slug}/"
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_like_and_comment_change_the_etag(
+        self,
+        api_client,
+        create_user,
+        create_post,
+        media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        url = f"{post_url}{create_post.slug}/"
+        etag = api_client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            toggle_like(user=create_user, slug=create_post.slug)
+        liked = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_comment(user=create_user, post=create_post, comment="comment")
+        commented = api_client.get(url, HTTP_IF_NONE_MATCH=liked["ETag"])
+
+        assert liked.status_code == status.HTTP_200_OK
+        assert liked["ETag"] != etag
+        assert commented.status_code == status.HTTP_200_OK
+        assert commented["ETag"] != liked["ETag"]
+
+    def test_comment_page_has_its_own_etag(
+        self, api_client, create_post, comment_factory, media_root
+    ):
+        comment_factory.create_batch(size=3, comment_post=create_post)
+        url = f"{post_url}{create_post.slug}/"
+
+        first_page = api_client.get(url)
+        second_page = api_client.get(first_page.data["next"])
+
+        assert first_page["ETag"] != second_page["ETag"]
+
+
+class TestPostListConditionalGet:
+    def test_if_none_match_return_304_without_queries(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        post_factory.create_batch(3, category=create_category)
+        etag = api_client.get(post_url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(post_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(queries) == 0
+
+    def test_conditional_request_return_304_when_the_cache_is_bypassed(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        post_factory.create_batch(3, category=create_category)
+        first = api_client.get(post_url)
+
+        with use_primary():
+            by_etag = api_client.get(post_url, HTTP_IF_NONE_MATCH=first["ETag"])
+            by_date = api_client.get(
+                post_url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+            )
+
+        assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+        assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_filters_have_their_own_etag(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        post_factory.create(category=create_category)
+
+        unfiltered = api_client.get(post_url)
+        filtered = api_client.get(f"{post_url}?category__name={create_category.name}")
+
+        assert unfiltered["ETag"] != filtered["ETag"]
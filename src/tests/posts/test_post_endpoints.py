@@ -1,7 +1,10 @@
 import json
 
 import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.forms import model_to_dict
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -122,6 +125,34 @@ class TestGetPost:
 
         assert len(response.data["results"]) == 1
 
+    def test_search_ranks_title_matches_first(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        in_content = post_factory.create(
+            title="other", content="django", category=create_category
+        )
+        in_title = post_factory.create(
+            title="django", content="other", category=create_category
+        )
+
+        response = api_client.get(f"{post_url}?search=django")
+
+        assert [post["id"] for post in response.data["results"]] == [
+            in_title.id,
+            in_content.id,
+        ]
+
+    def test_search_headlines_only_on_request(
+        self, api_client, post_factory, media_root
+    ):
+        post_factory.create(content="a post about django and rest")
+
+        plain = api_client.get(f"{post_url}?search=django")
+        with_headline = api_client.get(f"{post_url}?search=django&headline=true")
+
+        assert "headline" not in plain.data["results"][0]
+        assert "<b>django</b>" in with_headline.data["results"][0]["headline"]
+
 
 class TestUpdatePost:
     def test_anonymous_user_can_not_update_post_return_401(
@@ -213,3 +244,179 @@ class TestDeletePost:
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert response.data is None
+
+
+class TestCursorPagination:
+    def test_cursor_pages_cover_all_posts_once(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        posts = post_factory.create_batch(25, category=create_category)
+
+        ids = []
+        url = f"{post_url}?pagination=cursor"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert "total_posts" not in response.data
+            ids += [post["id"] for post in response.data["results"]]
+            url = response.data["links"]["next"]
+
+        assert ids == sorted((post.id for post in posts), reverse=True)
+
+    def test_previous_link_returns_the_previous_page(
+        self, api_client, post_factory, create_category, media_root
+    ):
+        post_factory.create_batch(15, category=create_category)
+
+        first_page = api_client.get(f"{post_url}?pagination=cursor").data
+        second_page = api_client.get(first_page["links"]["next"]).data
+        previous_page = api_client.get(second_page["links"]["previous"]).data
+
+        assert first_page["links"]["previous"] is None
+        assert len(second_page["results"]) == 5
+        assert second_page["links"]["next"] is None
+        assert previous_page["results"] == first_page["results"]
+
+    def test_cursor_pagination_with_filter(
+        self, api_client, post_factory, category_factory, media_root
+    ):
+        sport = category_factory.create(name="sport")
+        food = category_factory.create(name="food")
+        post_factory.create_batch(12, category=sport)
+        post_factory.create_batch(3, category=food)
+
+        first_page = api_client.get(
+            f"{post_url}?pagination=cursor&category__name=sport"
+        ).data
+        second_page = api_client.get(first_page["links"]["next"]).data
+
+        assert len(first_page["results"]) + len(second_page["results"]) == 12
+        assert {post["category"] for post in second_page["results"]} == {"sport"}
+
+    def test_cursor_mode_from_settings(
+        self, api_client, post_factory, media_root, settings
+    ):
+        settings.POST_PAGINATION_MODE = "cursor"
+        post_factory.create_batch(2)
+
+        response = api_client.get(post_url)
+
+        assert "total_posts" not in response.data
+        assert len(response.data["results"]) == 2
+
+    def test_invalid_cursor_return_404(self, api_client):
+        response = api_client.get(f"{post_url}?cursor=not-a-cursor")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unknown_pagination_mode_return_400(self, api_client):
+        response = api_client.get(f"{post_url}?pagination=offset")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("query", ["pagination=cursor", "cursor=abc"])
+    def test_cursor_pagination_with_search_return_400(self, api_client, query):
+        response = api_client.get(f"{post_url}?search=django&{query}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_keeps_rank_order_in_cursor_mode_from_settings(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_MODE = "cursor"
+        in_content = post_factory.create(
+            title="other", content="django", category=create_category
+        )
+        in_title = post_factory.create(
+            title="django", content="other", category=create_category
+        )
+        post_factory.create(
+            title="unrelated", content="unrelated", category=create_category
+        )
+
+        response = api_client.get(f"{post_url}?search=django")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [post["id"] for post in response.data["results"]] == [
+            in_title.id,
+            in_content.id,
+        ]
+
+
+class TestCountStrategies:
+    def test_omitted_count_runs_no_count_query(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "omitted"
+        post_factory.create_batch(12, category=create_category)
+
+        with CaptureQueriesContext(connection) as queries:
+            first_page = api_client.get(post_url)
+        second_page = api_client.get(first_page.data["links"]["next"])
+
+        assert "total_posts" not in first_page.data
+        assert not any("COUNT(" in query["sql"] for query in queries)
+        assert len(first_page.data["results"]) == 10
+        assert len(second_page.data["results"]) == 2
+        assert second_page.data["links"]["next"] is None
+
+    def test_cached_count_is_reused_across_pages(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "cached"
+        post_factory.create_batch(15, category=create_category)
+
+        first_page = api_client.get(post_url)
+        post_factory.create_batch(3, category=create_category)
+        second_page = api_client.get(f"{post_url}?page=2")
+
+        assert first_page.data["total_posts"] == 15
+        assert second_page.data["total_posts"] == 15
+
+    def test_estimated_count_above_threshold(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "estimate"
+        settings.POST_PAGINATION_ESTIMATE_THRESHOLD = 0
+        post_factory.create_batch(2, category=create_category)
+
+        response = api_client.get(post_url)
+
+        assert response.data["total_is_estimate"] is True
+        assert isinstance(response.data["total_posts"], int)
+
+    def test_exact_count_below_estimate_threshold(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "estimate"
+        post_factory.create_batch(2, category=create_category)
+
+        response = api_client.get(post_url)
+
+        assert "total_is_estimate" not in response.data
+        assert response.data["total_posts"] == 2
+
+    def test_stale_count_does_not_hide_last_pages(
+        self, api_client, post_factory, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "cached"
+        post_factory.create_batch(10, category=create_category)
+        api_client.get(post_url)
+        post_factory.create_batch(15, category=create_category)
+
+        second_page = api_client.get(f"{post_url}?page=2")
+        third_page = api_client.get(f"{post_url}?page=3")
+
+        assert second_page.data["total_posts"] == 10
+        assert len(second_page.data["results"]) == 10
+        assert second_page.data["links"]["next"] is not None
+        assert len(third_page.data["results"]) == 5
+        assert third_page.data["links"]["next"] is None
+
+    def test_unknown_count_strategy_is_improperly_configured(
+        self, api_client, create_category, media_root, settings
+    ):
+        settings.POST_PAGINATION_COUNT = "exactly"
+
+        with pytest.raises(ImproperlyConfigured):
+            api_client.get(post_url)
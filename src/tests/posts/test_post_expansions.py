@@ -0,0 +1,128 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from blog.models import FavoritePost
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+profile_url = reverse("accounts:api-v1:profile")
+expand = "author,category,comments[:2]"
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries)
+
+
+class TestPostListExpand:
+    def test_embeds_author_category_and_latest_comments(
+        self, api_client, media_root, create_post, comment_factory
+    ):
+        comments = comment_factory.create_batch(size=3, comment_post=create_post)
+
+        response = api_client.get(f"{post_url}?expand={expand}")
+
+        (post,) = response.data["results"]
+        profile = create_post.author.profile
+        assert post["author"] == {
+            "id": create_post.author.id,
+            "first_name": create_post.author.first_name,
+            "last_name": create_post.author.last_name,
+            "image": None,
+            "bio": profile.bio,
+        }
+        assert post["category"] == {
+            "id": create_post.category.id,
+            "name": create_post.category.name,
+        }
+        assert [comment["id"] for comment in post["comments"]] == [
+            comments[2].id,
+            comments[1].id,
+        ]
+        assert post["comments"][0]["comment_post"] == create_post.title
+
+    def test_query_count_does_not_grow_with_the_page(
+        self, api_client, media_root, post_factory, comment_factory, create_category
+    ):
+        url = f"{post_url}?expand={expand}"
+        for post in post_factory.create_batch(2, category=create_category):
+            comment_factory.create_batch(size=3, comment_post=post)
+        small_page = count_queries(api_client, url)
+
+        for post in post_factory.create_batch(8, category=create_category):
+            comment_factory.create_batch(size=3, comment_post=post)
+        full_page = count_queries(api_client, url)
+
+        assert small_page == full_page == count_queries(api_client, post_url) + 3
+
+    @pytest.mark.parametrize(
+        "value",
+        ["password", "comments[:0]", "comments[:11]", "author[:2]", "comments["],
+    )
+    def test_invalid_expand_return_400(self, api_client, value):
+        response = api_client.get(f"{post_url}?expand={value}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "expand" in response.data
+
+
+class TestPostDetailExpand:
+    def test_embeds_author_and_category(self, api_client, media_root, create_post):
+        url = f"{post_url}{create_post.slug}/"
+
+        queries = count_queries(api_client, f"{url}?expand=author,category")
+        response = api_client.get(f"{url}?expand=author,category")
+
+        assert response.data["results"]["author"]["id"] == create_post.author.id
+        assert response.data["results"]["category"]["id"] == create_post.category.id
+        assert queries == count_queries(api_client, url) + 2
+
+    def test_comments_are_already_embedded(self, api_client, media_root, create_post):
+        response = api_client.get(f"{post_url}{create_post.slug}/?expand=comments")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestProfileFavoritesExpand:
+    def test_query_count_does_not_grow_with_the_page(
+        self,
+        api_client,
+        media_root,
+        create_user,
+        post_factory,
+        comment_factory,
+        create_category,
+    ):
+        api_client.force_authenticate(user=create_user)
+        url = f"{profile_url}?expand={expand}"
+
+        def favorite(size):
+            for post in post_factory.create_batch(size, category=create_category):
+                comment_factory.create_batch(size=2, comment_post=post)
+                FavoritePost.objects.create(user=create_user.profile, post=post)
+
+        favorite(2)
+        small_page = count_queries(api_client, url)
+        favorite(8)
+        full_page = count_queries(api_client, url)
+        response = api_client.get(url)
+
+        assert small_page == full_page == count_queries(api_client, profile_url) + 3
+        for item in response.data["results"]["favoritepost"]:
+            assert set(item["post"]["author"]) == {
+                "id",
+                "first_name",
+                "last_name",
+                "image",
+                "bio",
+            }
+            assert len(item["post"]["comments"]) == 2
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+post_url = reverse("blog:api-v1:posts-list")
+
+
+class TestPostListFields:
+    def test_renders_only_the_requested_fields(
+        self, api_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(2, category=create_category)
+
+        response = api_client.get(f"{post_url}?fields=likes,id,title,slug")
+
+        assert response.status_code == status.HTTP_200_OK
+        for post in response.data["results"]:
+            assert list(post) == ["id", "title", "slug", "likes"]
+
+    def test_unrequested_joins_and_columns_are_not_queried(
+        self, api_client, media_root, post_factory, create_category
+    ):
+        post_factory.create_batch(2, category=create_category)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(f"{post_url}?fields=id,title")
+
+        (listing,) = [
+            query["sql"]
+            for query in queries
+            if "blog_post" in query["sql"] and "LIMIT" in query["sql"]
+        ]
+        assert "JOIN" not in listing
+        assert '"blog_post"."image"' not in listing
+        assert '"blog_post"."like_count"' not in listing
+
+    def test_unknown_field_return_400(self, api_client):
+        response = api_client.get(f"{post_url}?fields=id,password")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "password" in str(response.data["fields"])
+
+    def test_fieldsets_are_cached_apart(
+        self, api_client, media_root, post_factory, create_category
+    ):
+        post_factory.create(category=create_category)
+
+        sparse = api_client.get(f"{post_url}?fields=id")
+        full = api_client.get(post_url)
+
+        assert list(sparse.data["results"][0]) == ["id"]
+        assert "title" in full.data["results"][0]
+        assert sparse["ETag"] != full["ETag"]
+
+
+class TestPostDetailFields:
+    def test_without_comments_they_are_not_queried(
+        self, api_client, media_root, create_post, comment_factory
+    ):
+        comment_factory.create_batch(size=3, comment_post=create_post)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"{post_url}{create_post.slug}/?fields=id,title")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == {
+            "id": create_post.id,
+            "title": create_post.title,
+        }
+        assert response.data["next"] is None
+        assert not any("blog_comment" in query["sql"] for query in queries)
+        assert not any('"blog_post"."content"' in query["sql"] for query in queries)
+
+    def test_comments_keep_their_pagination(
+        self, api_client, media_root, create_post, comment_factory
+    ):
+        comment_factory.create_batch(size=3, comment_post=create_post)
+
+        response = api_client.get(f"{post_url}{create_post.slug}/?fields=comments")
+
+        assert list(response.data["results"]) == ["comments"]
+        assert len(response.data["results"]["comments"]) == 2
+        assert response.data["next"] is not None
@@ -0,0 +1,37 @@
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.check_query_plans import find_seq_scans
+
+pytestmark = pytest.mark.django_db
+
+
+def test_find_seq_scans_walks_subplans():
+    plan = [
+        {
+            "Plan": {
+                "Node Type": "Nested Loop",
+                "Plans": [
+                    {
+                        "Node Type": "Index Scan",
+                        "Relation Name": "blog_post",
+                        "Index Name": "blog_post_published_idx",
+                    },
+                    {
+                        "Node Type": "Hash",
+                        "Plans": [
+                            {"Node Type": "Seq Scan", "Relation Name": "blog_comment"}
+                        ],
+                    },
+                ],
+            }
+        }
+    ]
+
+    assert find_seq_scans(plan) == ["blog_comment"]
+
+
+def test_selectors_use_indexes_on_seeded_data(capsys):
+    call_command("check_query_plans", seed=3000)
+
+    assert "No sequential scans." in capsys.readouterr().out
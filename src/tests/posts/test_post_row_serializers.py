@@ -0,0 +1,84 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blog.api.v1.row_serializers import AbsoluteUriBuilder, PostRowSerializer
+from blog.api.v1.serializers import PostSerializer
+from blog.selectors import (
+    get_post,
+    get_post_comment_rows,
+    get_post_comments,
+    get_post_row,
+    get_post_rows,
+    get_posts,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def make_request(path, **kwargs):
+    return Request(APIRequestFactory().get(path), parser_context={"kwargs": kwargs})
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def test_list_rows_render_like_post_serializer(
+    media_root, post_factory, create_category
+):
+    post_factory.create(category=create_category)
+    post_factory.create(category=None, image="")
+    post_factory.create(category=create_category, title="ünïcode title")
+    request = make_request("/api/v1/blog/posts/?page=1")
+    context = {"request": request, "headlines": {}}
+
+    posts = list(get_posts().order_by("id"))
+    rows = list(get_post_rows().order_by("id"))
+
+    expected = PostSerializer(posts, many=True, context=context).data
+    assert render(PostRowSerializer(context).serialize(rows)) == render(expected)
+
+
+def test_detail_row_renders_like_post_serializer(
+    media_root, create_post, comment_factory
+):
+    comment_factory.create_batch(size=2, comment_post=create_post)
+    request = make_request(f"/api/v1/blog/posts/{create_post.slug}/", slug="x")
+
+    post = get_post(create_post.slug)
+    comments = list(get_post_comments(post).order_by("id"))
+    for comment in comments:
+        comment.comment_post = post
+    row = get_post_row(create_post.slug)
+    comment_rows = list(get_post_comment_rows(row.id).order_by("id"))
+
+    expected = PostSerializer(
+        post, context={"request": request, "comments": comments}
+    ).data
+    data = PostRowSerializer({"request": request}, detail=True).to_representation(
+        row, comment_rows
+    )
+    assert render(data) == render(expected)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/blog/posts/", "/api/v1/blog/posts/slug"])
+@pytest.mark.parametrize(
+    "location",
+    [
+        "slug-1",
+        "media/posts/cover.jpg",
+        "/media/posts/cover.jpg",
+        "media/pöst.jpg",
+        "../up",
+        "./here",
+        "//other.host/x",
+        "http://other.host/x",
+        "a?b=c",
+    ],
+)
+def test_absolute_uri_builder_matches_request(path, location):
+    request = make_request(path)
+
+    assert AbsoluteUriBuilder(request)(location) == request.build_absolute_uri(location)
@@ -1,4 +1,7 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from blog.selectors import get_post, get_posts
 
@@ -24,3 +27,49 @@ def test_get_single_post(media_root, user_factory, post_factory):
 
     assert post.slug == post1.slug
     assert post.author == post1.author
+
+
+def test_get_posts_defers_content(media_root, user_factory, post_factory):
+    author = user_factory.create()
+    post_factory.create(author=author)
+
+    post = get_posts().get()
+
+    assert "content" in post.get_deferred_fields()
+    assert "comments" not in getattr(post, "_prefetched_objects_cache", {})
+
+
+def test_post_list_query_count(
+    api_client, media_root, create_category, post_factory, comment_factory
+):
+    posts = post_factory.create_batch(size=5, category=create_category)
+    for post in posts:
+        comment_factory.create_batch(size=2, comment_post=post)
+
+    # one COUNT(*) for the pagination and one SELECT for the page
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("blog:api-v1:posts-list"))
+
+    assert len(response.data["results"]) == 5
+    assert len(queries) == 2
+    assert not any("blog_comment" in query["sql"] for query in queries)
+
+
+def test_post_list_bytes_transferred(
+    api_client, media_root, create_category, post_factory
+):
+    content = "x" * 64 * 1024
+    post_factory.create_batch(size=3, category=create_category, content=content)
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(reverse("blog:api-v1:posts-list"))
+    page_query = next(query["sql"] for query in queries if "LIMIT" in query["sql"])
+
+    with connection.cursor() as cursor:
+        cursor.execute(page_query)
+        rows = cursor.fetchall()
+    transferred = sum(len(str(value)) for row in rows for value in row)
+
+    assert '"blog_post"."content"' not in page_query
+    assert len(rows) == 3
+    assert transferred < len(content)
@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
 
 from blog.models import Post
-from blog.services import create_post, delete_post, update_post
+from blog.services import allocate_slug, create_post, delete_post, update_post
+from blog.tasks import reindex_post_search_vectors
 
 pytestmark = pytest.mark.django_db
 
@@ -53,6 +58,90 @@ def test_update_post(post_factory, user_factory, media_root):
     assert post.published_at.strftime("%Y-%m-%d %H:%M:%S") == "2024-04-13 04:26:00"
 
 
+def test_update_post_title_allocates_a_slug(post_factory, user_factory, media_root):
+    author = user_factory.create()
+    taken = post_factory.create(author=author, slug="first")
+    update_post({"slug": "taken"}, author, taken.slug)
+    post = post_factory.create(author=author, title="Original", slug="original")
+
+    update_post({"content": "New Content"}, author, post.slug)
+    post.refresh_from_db()
+    assert post.slug == "original"
+
+    update_post({"title": "Taken"}, author, post.slug)
+    post.refresh_from_db()
+    assert post.slug == "taken--2"
+
+
+def test_update_post_title_with_the_same_slug_keeps_it(
+    post_factory, user_factory, media_root
+):
+    author = user_factory.create()
+    post = post_factory.create(author=author, title="Hello world", slug="hello-world")
+
+    update_post({"title": "Hello, world!"}, author, post.slug)
+    post.refresh_from_db()
+
+    assert post.title == "Hello, world!"
+    assert post.slug == "hello-world"
+
+
+def test_slug_set_by_hand_with_a_suffix_is_not_allocated_again(
+    post_factory, user_factory, media_root
+):
+    author = user_factory.create()
+    post = post_factory.create(author=author, slug="first")
+
+    update_post({"slug": "hello-world--2"}, author, post.slug)
+
+    assert allocate_slug("Hello world") == "hello-world--3"
+
+
+def test_allocate_slug(db):
+    assert allocate_slug("Hello World") == "hello-world"
+    assert allocate_slug("Hello, world!") == "hello-world--2"
+    assert allocate_slug("!!!") == "post"
+    assert allocate_slug("") == "post--2"
+
+    slug = allocate_slug("a long title " * 10)
+    assert slug == ("a-long-title-" * 4)[:40].strip("-")
+    assert len(allocate_slug("a long title " * 10)) <= 50
+
+
+def create_post_titled(title, user, category):
+    try:
+        return create_post(
+            user=user,
+            category=category,
+            title=title,
+            content="content",
+            image="image",
+            status=True,
+            published_at="2024-04-13 04:26:00",
+        ).slug
+    finally:
+        connection.close()
+
+
+def test_concurrent_posts_with_the_same_title(
+    transactional_db, user_factory, category_factory
+):
+    user = user_factory.create()
+    category = category_factory.create()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        slugs = list(
+            executor.map(
+                lambda _: create_post_titled("Same title", user, category), range(40)
+            )
+        )
+
+    assert sorted(slugs) == sorted(
+        ["same-title", *(f"same-title--{n}" for n in range(2, 41))]
+    )
+    assert Post.objects.filter(title="Same title").count() == 40
+
+
 def test_delete_post(post_factory, user_factory, media_root):
     author = user_factory.create()
     post = post_factory.create(author=author)
@@ -61,3 +150,32 @@ def test_delete_post(post_factory, user_factory, media_root):
 
     with pytest.raises(Post.DoesNotExist):
         Post.objects.get(slug=post.slug)
+
+
+def test_post_search_vector_follows_content(post_factory, user_factory, media_root):
+    author = user_factory.create()
+    post = post_factory.create(author=author, content="first")
+
+    update_post({"content": "second"}, author, post.slug)
+
+    assert (
+        Post.objects.filter(search_vector=SearchQuery("second", config="simple")).get()
+        == post
+    )
+    assert not Post.objects.filter(
+        search_vector=SearchQuery("first", config="simple")
+    ).exists()
+
+
+def test_reindex_post_search_vectors(post_factory, create_category, media_root):
+    posts = post_factory.create_batch(
+        size=3, category=create_category, content="reindexed"
+    )
+    Post.objects.update(search_vector=None)
+
+    reindexed = reindex_post_search_vectors(batch_size=2)
+
+    assert reindexed == 3
+    assert Post.objects.filter(
+        search_vector=SearchQuery("reindexed", config="simple")
+    ).count() == len(posts)